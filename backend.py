@@ -45,12 +45,22 @@ class Backend:
             self.tas.hwnd    = self.tas.getWinHWND()
             win32com.client.Dispatch("WScript.Shell").SendKeys('%')
             win32gui.SetForegroundWindow(self.tas.hwnd)
-            getattr(self.tas.currRun, 'run' if method == RunMethod.RUN else 'test')()
+            self.tas.startCapture()
+            try:
+                getattr(self.tas.currRun, 'run' if method == RunMethod.RUN else 'test')()
+            finally:
+                self.tas.stopCapture()
+                self.tas.saveOCRCache()
     else:
         def run(self, method: RunMethod) -> None:
             self.tas.currRun = self.runs[self.currRun]
             self.tas.winPos  = self.tas.getWinPos()
-            getattr(self.tas.currRun, 'run' if method == RunMethod.RUN else 'test')()
+            self.tas.startCapture()
+            try:
+                getattr(self.tas.currRun, 'run' if method == RunMethod.RUN else 'test')()
+            finally:
+                self.tas.stopCapture()
+                self.tas.saveOCRCache()
 
     def select(self, idx: int) -> None:
         self.currRun = idx
@@ -36,18 +36,26 @@ COLLECT_ALL = [
     "skimage"
 ]
 
+BUILD_MODULES = [
+    "textRecognition",
+    "textRecognitionNogil"
+]
+
 def build():
     Options.annotate = False
 
     oldArgs = sys.argv
     sys.argv = [sys.argv[0], "build_ext", "--inplace"]
 
-    file = os.path.abspath(str(pathlib.Path('./modules/textRecognition/source/textRecognition.pyx')))
+    files = [
+        os.path.abspath(str(pathlib.Path(f'./modules/textRecognition/source/{name}.pyx')))
+        for name in BUILD_MODULES
+    ]
     os.chdir(str(pathlib.Path('./modules/textRecognition')))
     setup(
         name         = "textRecognition",
         include_dirs = [numpy.get_include()], 
-        ext_modules  = cythonize(file, compiler_directives = {
+        ext_modules  = cythonize(files, compiler_directives = {
             "language_level": "3"
         }),
         zip_safe = False
@@ -55,8 +63,9 @@ def build():
 
     sys.argv = oldArgs
     
-    file = str(pathlib.Path('./source/textRecognition.c'))
-    if os.path.exists(file): os.remove(file)
+    for name in BUILD_MODULES:
+        file = str(pathlib.Path(f'./source/{name}.c'))
+        if os.path.exists(file): os.remove(file)
 
     fold = str(pathlib.Path('./build'))
     if os.path.exists(fold): shutil.rmtree(fold)
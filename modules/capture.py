@@ -0,0 +1,157 @@
+from PIL    import Image, ImageGrab
+from typing import Callable
+import os, time, threading, numpy as np
+
+import logging
+
+logger = logging.getLogger('tas.' + __name__)
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+class ScreenCapture:
+    """Grabs rectangles of the screen, using mss when it's available and PIL otherwise.
+
+    mss only reads the requested rectangle (through XShmGetImage/XGetImage on Linux and BitBlt on Windows),
+    so small areas are much cheaper to capture than the whole window.
+    """
+
+    def __init__(self):
+        self.backend = "PIL" if mss is None else "mss"
+        self.__local = threading.local() # mss instances can't be shared between threads
+
+        logger.info(f"using {self.backend} for screen capture")
+
+    def __getMss(self) -> "mss.base.MSSBase":
+        if not hasattr(self.__local, "mss"):
+            self.__local.mss = mss.mss()
+
+        return self.__local.mss
+
+    def grab(self, box: tuple[int, int, int, int]) -> Image.Image:
+        """Captures an area of the screen.
+
+        Args:
+            box: The (left, top, right, bottom) of the area in screen coordinates.
+
+        Returns:
+            The captured area as an Image in RGB format.
+        """
+        if mss is None:
+            return ImageGrab.grab(box).convert("RGB")
+
+        shot = self.__getMss().grab({
+            "left":   box[0],
+            "top":    box[1],
+            "width":  box[2] - box[0],
+            "height": box[3] - box[1]
+        })
+        return Image.frombuffer("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+class CaptureThread:
+    """Keeps capturing the window in the background, into a ring buffer of the most recent frames.
+
+    Every frame gets a sequence number, so waiters can ask for "the first frame after N"
+    and get it as soon as it's there, instead of taking a capture themselves.
+    """
+
+    def __init__(self, grab: Callable[[], Image.Image], size: int = 8):
+        self.grab = grab
+        self.size = size
+        self.seq  = 0 # sequence number of the latest frame, 0 if there's none yet
+
+        self.__frames: np.ndarray | None = None
+        self.__seqs  = np.zeros(size, dtype = np.int64)
+        self.__times = np.zeros(size, dtype = np.float64)
+        self.__cond  = threading.Condition()
+
+        self.__running = False
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.__running
+
+    def start(self) -> None:
+        if self.__running: return
+
+        self.__running = True
+        self.__thread  = threading.Thread(target = self.__loop, name = "capture", daemon = True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        if not self.__running: return
+
+        self.__running = False
+        self.__thread.join()
+        self.__thread = None
+
+        # nobody should be left waiting for a frame that won't come
+        with self.__cond: self.__cond.notify_all()
+
+    def __store(self, img: np.ndarray) -> None:
+        seq  = self.seq + 1
+        slot = seq % self.size
+
+        with self.__cond:
+            # buffers are allocated once, and again only if the window changes size
+            if self.__frames is None or self.__frames.shape[1:] != img.shape:
+                self.__frames = np.empty((self.size,) + img.shape, dtype = np.uint8)
+                self.__seqs[:] = 0
+
+            self.__frames[slot] = img
+            self.__seqs[slot]   = seq
+            self.__times[slot]  = time.perf_counter()
+            self.seq = seq
+            self.__cond.notify_all()
+
+    def __loop(self) -> None:
+        while self.__running:
+            try:
+                img = np.asarray(self.grab())
+            except Exception as e:
+                logger.warning(f"Unable to capture frame: {e}")
+                time.sleep(0.1)
+                continue
+
+            self.__store(img)
+
+    def waitNext(self, after: int, timeout: float | None = None) -> tuple[int, Image.Image]:
+        """Waits for a frame newer than the given sequence number.
+
+        Args:
+            after: Sequence number of the last frame the caller knows of.
+            timeout: Maximum time to wait, in seconds. None waits forever.
+
+        Returns:
+            The sequence number of the latest frame and the frame as an Image in RGB format.
+
+        Raises:
+            TimeoutError: If no new frame arrived in time, or the thread was stopped.
+        """
+        with self.__cond:
+            if not self.__cond.wait_for(lambda: self.seq > after or not self.__running, timeout) or self.seq <= after:
+                raise TimeoutError(f"No frame after {after} was captured")
+
+            # the frame is copied out, so the slot can be reused while the caller holds onto it
+            seq = self.seq
+            return seq, Image.fromarray(self.__frames[seq % self.size].copy())
+
+    def history(self) -> list[tuple[int, float, np.ndarray]]:
+        """Returns the buffered frames, oldest first, as (sequence number, perf_counter time, frame)."""
+        with self.__cond:
+            if self.__frames is None: return []
+
+            return [
+                (int(self.__seqs[slot]), float(self.__times[slot]), self.__frames[slot].copy())
+                for slot in np.argsort(self.__seqs) if self.__seqs[slot] != 0
+            ]
+
+    def dump(self, folder: str) -> None:
+        """Saves the buffered frames to a folder, named by sequence number. Useful to check what a wait loop missed."""
+        os.makedirs(folder, exist_ok = True)
+
+        for seq, _, frame in self.history():
+            Image.fromarray(frame).save(os.path.join(folder, f"{seq:08d}.png"))
@@ -1,8 +1,11 @@
+import os, json, math, logging
+
 MENU_DELAY = 1.6
 DAY_DELAY  = 9
 
 STAMP_OPEN_TIME  = 0.5
 STAMP_CLOSE_TIME = 0.3
+STAMP_PRESS_TIME = 0.25 # before the stamp bar can be closed
 
 END_DELAY = 5.7
 INSPECT_ALPHACHANGE_TIME = 0.5
@@ -15,4 +18,130 @@ CONFISCATE_SLIP_APPEAR_TIME = 0.5
 PASSPORT_DRAWER_OPEN_TIME = 1
 PASSPORT_DRAWER_CLOSE_TIME = 0.5
 
-GUN_BULLETS_APPEAR_TIME = 1 
\ No newline at end of file
+GUN_BULLETS_APPEAR_TIME = 1 
+
+INTERROGATE_TIME = 0.35
+
+SAVE_SELECT_TIME = 0.25 # between picking a day save and pressing continue
+BOMB_SCREWS_TIME = 0.25 # after the screws of the day 15 bomb show up
+
+# only used by the experimental version
+MOMENTUM_STOP_TIME = 0.15
+DRAG_RELEASE_TIME  = 0.1
+
+# with TAS.ADAPTIVE_WAITS, animations are over once their area stays the same for this many frames.
+# the delays above become timeouts
+ANIMATION_STILL_FRAMES = 4
+
+# minimum time the game needs to see each kind of mouse input.
+# these replace the pause pyautogui used to sleep for after every call
+INPUT_SETTLE_TIMES = {
+    "move": 0.05,
+    "down": 0.05,
+    "up":   0.05
+}
+# the experimental version uses these instead
+EXPERIMENTAL_INPUT_SETTLE_TIMES = {
+    "move": 0.034,
+    "down": 0.034,
+    "up":   0.034
+}
+
+INTRO_CLICKS       = 11
+INTRO_CLICK_FRAMES = 3
+
+# timings measured on this machine by the calibration run replace the ones above
+TIMINGS_VERSION = 1
+TIMINGS_FILE    = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "config", "timings.json"
+)
+
+def _isNumber(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _isDelay(value) -> bool:
+    # json.load also reads NaN and Infinity
+    return _isNumber(value) and math.isfinite(value) and value >= 0
+
+def loadTimings(file: str = TIMINGS_FILE) -> list[str]:
+    """Replaces delays with the ones of a timing profile, if there's one. Returns the names of the replaced delays."""
+    if not os.path.exists(file): return []
+
+    # this runs on import, so a broken profile shouldn't stop the tas from starting
+    logger = logging.getLogger('tas.' + __name__)
+    try:
+        with open(file, "r", encoding = "utf-8") as f:
+            timings = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Couldn't read timing profile {file}, using default delays: {e}")
+        return []
+
+    if not isinstance(timings, dict):
+        logger.warning(f"Timing profile {file} has no delays, using default delays")
+        return []
+
+    if timings.get("version") != TIMINGS_VERSION:
+        logger.warning(f"Timing profile {file} is from another version, using default delays. Run the calibration again to update it")
+        return []
+
+    delays = timings.get("delays")
+    if not isinstance(delays, dict):
+        logger.warning(f"Timing profile {file} has no delays, using default delays")
+        return []
+
+    loaded = []
+    for name, value in delays.items():
+        # unknown names are left alone, so old profiles don't break anything
+        current = globals().get(name)
+        if isinstance(current, dict) and isinstance(value, dict):
+            invalid = [k for k, v in value.items() if k in current and not _isDelay(v)]
+            if invalid: logger.warning(f"Ignoring invalid delays in timing profile {file}: {', '.join(f'{name}[{k}]' for k in invalid)}")
+
+            value = {k: v for k, v in value.items() if k in current and _isDelay(v)}
+            if not value: continue
+            current.update(value)
+        elif _isNumber(current):
+            if not _isDelay(value):
+                logger.warning(f"Ignoring invalid delay in timing profile {file}: {name} = {value!r}")
+                continue
+
+            globals()[name] = value
+        else: continue
+
+        loaded.append(name)
+
+    return loaded
+
+def saveTimings(delays: dict[str, float], file: str = TIMINGS_FILE) -> None:
+    """Adds delays to a timing profile, keeping the others already in there."""
+    timings = {}
+    if os.path.exists(file):
+        try:
+            with open(file, "r", encoding = "utf-8") as f:
+                timings = json.load(f)
+        except ValueError: pass # a broken profile just gets replaced
+
+    # profiles from other versions are replaced, their delays might not mean the same thing anymore
+    if not isinstance(timings, dict) or timings.get("version") != TIMINGS_VERSION: timings = {}
+    if not isinstance(timings.get("delays"), dict): timings["delays"] = {}
+
+    timings["version"] = TIMINGS_VERSION
+    timings["delays"].update(delays)
+
+    with open(file, "w", encoding = "utf-8") as f:
+        json.dump(timings, f, indent = 4)
+
+LOADED_TIMINGS = loadTimings()
+
+def toFrames(seconds: float) -> int:
+    return round(seconds * 60) # the game runs at 60fps
+
+# the same waits in frames, for gestures
+STAMP_OPEN_FRAMES  = toFrames(STAMP_OPEN_TIME)
+STAMP_PRESS_FRAMES = toFrames(STAMP_PRESS_TIME)
+STAMP_CLOSE_FRAMES = toFrames(STAMP_CLOSE_TIME)
+SAVE_SELECT_FRAMES = toFrames(SAVE_SELECT_TIME)
+BOMB_SCREWS_FRAMES = toFrames(BOMB_SCREWS_TIME)
+
+INPUT_SETTLE_FRAMES              = {action: toFrames(t) for action, t in INPUT_SETTLE_TIMES.items()}
+EXPERIMENTAL_INPUT_SETTLE_FRAMES = {action: toFrames(t) for action, t in EXPERIMENTAL_INPUT_SETTLE_TIMES.items()}
@@ -36,6 +36,13 @@ WEIGHT_CHARS = "0123456789kg"
 
 TRANSCRIPTION_CHARS = PASSPORT_CITY_CHARS + DIGITS + "'?!"
 
+# every character the text recognition system can be asked for, used to prerender glyphs
+TEXT_CHARS = "".join(dict.fromkeys(
+    PASSPORT_NAME_CHARS + PASSPORT_CITY_CHARS + PASSPORT_NUM_CHARS + DATE_CHARS + 
+    PERMIT_PASS_NAME_CHARS + DISEASE_CHARS + PERMIT_PASS_CHARS_NUM + ID_LAST_NAME_CHARS + 
+    DIPLOMATIC_AUTH_ACCESS_TO_CHARS + HEIGHT_CHARS + WEIGHT_CHARS + TRANSCRIPTION_CHARS
+))
+
 class Sex(Enum):
     # as much as i don't like this, the game has two of these :c
     # so i'm using booleans cause cleaner/faster code
@@ -161,6 +161,12 @@ MATCHING_DATA_MESSAGE_SIZE = (105, 40)
 
 SLEEP_BUTTON = (965, 635)
 
+# areas where buttons are looked for. the rest of the window is only searched if TAS.LOCATE_FALLBACK is set
+SLEEP_BUTTON_AREA = (699, 591, 1156, 680)
+BUTTON_AREAS = {
+    "sleep": SLEEP_BUTTON_AREA
+}
+
 TRANSCRIPTION_PAGE_TEXT_AREA      = (26, 32, 277, 367)
 TRANSCRIPTION_TEXT_Y_SIZE         = 14
 TRANSCRIPTION_LINE_OFFSET         = 4
@@ -230,6 +236,11 @@ DRAG_TO_WITH_GIVE_AMPLITUDE = (
     PERSON_AREA[3] - PERSON_POS[1] - 50
 )
 
+# areas watched to tell when animations are over
+STAMP_BAR_AREA       = (595, 280, 1135, 360)
+PASSPORT_DRAWER_AREA = (380, 630,  560, 680)
+SHUTTER_AREA         = PERSON_AREA
+
 PEOPLE_COLOR = (27, 27, 27)
 CIVILIANS_AREA = ( 16, 31, 236, 236)
 GUARDS_AREA    = (600, 61, 940, 236)
@@ -7,6 +7,7 @@ from modules.constants.delays   import *
 from modules.constants.other    import *
 from modules.documents.passport import Nation
 from modules.documents.document import Document
+from modules.documents.seals    import SealCheck
 from modules.textRecognition    import parseText, parseDate
 from modules.utils              import *
 
@@ -42,10 +43,6 @@ class AccessPermit(Document):
         sealWhiteBg.paste((255, 255, 255), (0, 0) + sealWhiteBg.size)
         AccessPermit.BACKGROUNDS["seal-white"] = sealWhiteBg
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(AccessPermit.LAYOUT["label"])), AccessPermit.BACKGROUNDS["label"])
-    
     @Document.field
     def name(self) -> Name:
         return Name.fromPermitOrPass(parseText(
@@ -121,11 +118,15 @@ class AccessPermit(Document):
     def sealArea(self) -> Image.Image:
         return self.docImg.crop(AccessPermit.LAYOUT["seal-area"])
 
-    def checkForgery(self) -> bool:        
-        return all(Document.checkNoSeal(
+    @Document.field
+    def sealCheck(self) -> SealCheck:
+        return Document.checkSeals(
             np.asarray(self.sealArea), AccessPermit.BACKGROUNDS["seal-area"],
-            seal, AccessPermit.BACKGROUNDS["seal-white"]
-        ) for seal in AccessPermit.TAS.MOA_SEALS)
+            AccessPermit.TAS.MOA_SEALS, AccessPermit.BACKGROUNDS["seal-white"]
+        )
+
+    def checkForgery(self) -> bool:        
+        return not self.sealCheck.found
     
     def __repr__(self) -> str:
         return f"""==- Access Permit -==
@@ -52,10 +52,6 @@ class ArstotzkanID(Document):
 
         ArstotzkanID.BACKGROUNDS["label"] = np.asarray(ArstotzkanID.BACKGROUNDS["label"])
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(ArstotzkanID.LAYOUT["label"])), ArstotzkanID.BACKGROUNDS["label"])
-
     @Document.field
     def name(self) -> Name:
         return Name.fromPassportOrID(
@@ -102,8 +98,9 @@ class ArstotzkanID(Document):
             endAt = "kg"
         )[:-2])
     
-    # check note in faceRecognition.py
-    @Document.field
+    # check note in faceRecognition.py.
+    # no picture tables are loaded yet, so this isn't parsed in background
+    @Document.field(prefetch = False)
     def face(self) -> Face:
         return Face.parse(self.docImg.crop(ArstotzkanID.LAYOUT["picture"]), FaceType.ID_PICTURE)
 
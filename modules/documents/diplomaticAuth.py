@@ -7,6 +7,7 @@ from modules.constants.delays   import *
 from modules.constants.other    import *
 from modules.documents.passport import Nation
 from modules.documents.document import Document
+from modules.documents.seals    import SealBank, SealCheck
 from modules.textRecognition    import parseText
 from modules.utils              import *
 
@@ -38,7 +39,7 @@ class DiplomaticAuth(Document):
                 "seals", nation.value.lower()
             )
 
-            DiplomaticAuth.SEALS[Nation(nation.value)] = tuple(
+            DiplomaticAuth.SEALS[Nation(nation.value)] = SealBank(
                 Image.open(os.path.join(nationPath, file)).convert("RGB")
                 for file in os.listdir(nationPath)
             )
@@ -55,10 +56,6 @@ class DiplomaticAuth(Document):
         sealWhiteBg.paste((255, 255, 255), (0, 0) + sealWhiteBg.size)
         DiplomaticAuth.BACKGROUNDS["seal-white"] = sealWhiteBg
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(DiplomaticAuth.LAYOUT["label"])), DiplomaticAuth.BACKGROUNDS["label"])
-    
     @Document.field
     def name(self) -> Name:
         return Name.fromPermitOrPass(parseText(
@@ -97,11 +94,15 @@ class DiplomaticAuth(Document):
     def sealArea(self) -> Image.Image:
         return self.docImg.crop(DiplomaticAuth.LAYOUT["seal-area"])
 
-    def checkForgery(self) -> bool:        
-        return all(Document.checkNoSeal(
+    @Document.field
+    def sealCheck(self) -> SealCheck:
+        return Document.checkSeals(
             np.asarray(self.sealArea), DiplomaticAuth.BACKGROUNDS["seal-area"],
-            seal, DiplomaticAuth.BACKGROUNDS["seal-white"]
-        ) for seal in DiplomaticAuth.SEALS[self.nation])
+            DiplomaticAuth.SEALS[self.nation], DiplomaticAuth.BACKGROUNDS["seal-white"]
+        )
+
+    def checkForgery(self) -> bool:        
+        return not self.sealCheck.found
     
     def __repr__(self) -> str:
         return f"""==- Diplomatic Authorization -==
@@ -1,9 +1,11 @@
-from abc    import ABC
-from PIL    import Image
-from typing import Self, Type, ClassVar, Callable, TypeVar, Generic, TYPE_CHECKING
-import numpy as np, pyautogui as pg
+from abc                import ABC
+from PIL                import Image
+from typing             import Self, Type, ClassVar, Callable, TypeVar, Generic, TYPE_CHECKING
+from concurrent.futures import Executor
+import numpy as np
 
-from modules.utils import bgFilter, offsetBox
+from modules.utils           import bgFilter, offsetBox
+from modules.documents.seals import SealBank, SealCheck
 
 if TYPE_CHECKING:
     from tas import TAS
@@ -22,9 +24,10 @@ class BaseDocument(ABC):
     def load(): 
         raise NotImplementedError
     
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool: 
-        raise NotImplementedError
+    @classmethod
+    def getLabel(cls) -> tuple[tuple[int, int, int, int], np.ndarray]:
+        """Returns the box of the label region and what it looks like, used to identify the document."""
+        return cls.LAYOUT["label"], np.asarray(cls.BACKGROUNDS["label"])
     
     @staticmethod
     def getBgs(layout: dict[str, tuple[int, int, int, int]], innerTexture: Image.Image) -> dict[str, Image.Image]:
@@ -42,27 +45,54 @@ class BaseDocument(ABC):
         return diff
     
     @staticmethod
-    def checkNoSeal(sealArea: np.ndarray, background: Image.Image, seal: Image.Image, whiteBg: Image.Image | None = None) -> bool:
-        return pg.locate(seal, Image.fromarray(BaseDocument.__sealFilter(sealArea, background, whiteBg))) is None
-    
-    @staticmethod
-    def sealPos(sealArea: np.ndarray, background: Image.Image, whiteBg: Image.Image | None = None) -> tuple[int, int]:
-        ys, xs, _ = BaseDocument.__sealFilter(sealArea, background, whiteBg).nonzero()
-        return (xs[0], ys[0])
+    def checkSeals(sealArea: np.ndarray, background: Image.Image, seals: SealBank, whiteBg: Image.Image | None = None) -> SealCheck:
+        # the area is filtered once and matched against every seal at the same time
+        filtered = BaseDocument.__sealFilter(sealArea, background, whiteBg)
+        return SealCheck(filtered, seals.match(filtered))
 
     @staticmethod
-    def field(fn: Callable[[Self], T]) -> TypedGetterProperty[T]:
+    def field(fn: Callable[[Self], T] | None = None, *, prefetch: bool = True) -> TypedGetterProperty[T]:
+        """Caches the result of a document field. Use `@Document.field(prefetch = False)` for fields that shouldn't be parsed in background."""
+        if fn is None:
+            return lambda fn: BaseDocument.field(fn, prefetch = prefetch)
+
+        fieldName   = "_cached__"  + fn.__name__
+        pendingName = "_pending__" + fn.__name__
+
+        def compute(self) -> T:
+            val = fn(self)
+            setattr(self, fieldName, val)
+            return val
+
         @TypedGetterProperty
         def wrapper(self):
-            fieldName = "_cached__" + fn.__name__
-            
             if hasattr(self, fieldName):
-                val = getattr(self, fieldName)
-            else:
-                val = fn(self)
-                setattr(self, fieldName, val)
-            return val
+                return getattr(self, fieldName)
+
+            # if the field is being parsed in background, wait for it.
+            # if it didn't start yet, it's parsed here instead (avoids waiting on a busy pool)
+            future = getattr(self, pendingName, None)
+            if future is not None and not future.cancel():
+                return future.result()
+
+            return compute(self)
+
+        def prefetchField(self, executor: Executor) -> None:
+            if not hasattr(self, fieldName) and not hasattr(self, pendingName):
+                setattr(self, pendingName, executor.submit(compute, self))
+
+        if prefetch: wrapper.prefetch = prefetchField
         return wrapper
+
+    def prefetch(self, executor: Executor) -> None:
+        """Starts parsing every field of the document in background. Accessing a field only waits for its own result."""
+        seen = set()
+        for cls in type(self).__mro__:
+            for name, attr in vars(cls).items():
+                if name not in seen and isinstance(attr, TypedGetterProperty) and hasattr(attr, "prefetch"):
+                    attr.prefetch(self, executor)
+
+                seen.add(name) # fields can be overridden by subclasses
     
     def __init__(self, docImg: Image.Image, tableOffs: tuple[int, int]):
         self.docImg      = docImg
@@ -6,6 +6,7 @@ from modules.constants.screen   import *
 from modules.constants.delays   import *
 from modules.constants.other    import *
 from modules.documents.document import Document
+from modules.documents.seals    import SealCheck
 from modules.textRecognition    import parseText, parseDate
 from modules.utils              import *
 
@@ -37,10 +38,6 @@ class EntryPermit(Document):
         sealWhiteBg.paste((255, 255, 255), (0, 0) + sealWhiteBg.size)
         EntryPermit.BACKGROUNDS["seal-white"] = sealWhiteBg
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(EntryPermit.LAYOUT["label"])), EntryPermit.BACKGROUNDS["label"])
-    
     @Document.field
     def name(self) -> Name:
         return Name.fromPermitOrPass(parseText(
@@ -84,13 +81,17 @@ class EntryPermit(Document):
     def sealArea(self) -> Image.Image:
         return self.docImg.crop(EntryPermit.LAYOUT["seal-area"])
 
+    @Document.field
+    def sealCheck(self) -> SealCheck:
+        return Document.checkSeals(
+            np.asarray(self.sealArea), EntryPermit.BACKGROUNDS["seal-area"],
+            EntryPermit.TAS.MOA_SEALS, EntryPermit.BACKGROUNDS["seal-white"]
+        )
+
     def checkForgery(self, date: date) -> bool:
         if date < EntryPermit.TAS.DAY_11: return False
         
-        return all(Document.checkNoSeal(
-            np.asarray(self.sealArea), EntryPermit.BACKGROUNDS["seal-area"],
-            seal, EntryPermit.BACKGROUNDS["seal-white"]
-        ) for seal in EntryPermit.TAS.MOA_SEALS)
+        return not self.sealCheck.found
     
     def __repr__(self) -> str:
         return f"""==- Entry Permit -==
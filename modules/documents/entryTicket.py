@@ -25,9 +25,9 @@ class EntryTicket(Document):
         EntryTicket.INNER_TEXTURE = doubleImage(Image.open(os.path.join(EntryTicket.TAS.ASSETS, "papers", "entryTicket", "inner.png")).convert("RGB"))
         EntryTicket.LABEL = np.asarray(EntryTicket.INNER_TEXTURE.crop(EntryTicket.LAYOUT["label"]))
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(EntryTicket.LAYOUT["label"])), EntryTicket.LABEL)
+    @classmethod
+    def getLabel(cls) -> tuple[tuple[int, int, int, int], np.ndarray]:
+        return EntryTicket.LAYOUT["label"], EntryTicket.LABEL
     
     @Document.field
     def date(self) -> datetime.date:
@@ -6,6 +6,7 @@ from modules.constants.screen   import *
 from modules.constants.delays   import *
 from modules.constants.other    import *
 from modules.documents.document import Document
+from modules.documents.seals    import SealCheck
 from modules.documents.passport import Nation
 from modules.textRecognition    import parseText, parseDate
 from modules.faceRecognition    import Face, FaceType
@@ -44,10 +45,6 @@ class GrantOfAsylum(Document):
         sealWhiteBg.paste((255, 255, 255), (0, 0) + sealWhiteBg.size)
         GrantOfAsylum.BACKGROUNDS["seal-white"] = sealWhiteBg
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(GrantOfAsylum.LAYOUT["label"])), GrantOfAsylum.BACKGROUNDS["label"])
-    
     @Document.field
     def name(self) -> Name:
         return Name(
@@ -112,9 +109,17 @@ class GrantOfAsylum(Document):
     @Document.field
     def sealArea(self) -> Image.Image:
         return self.docImg.crop(GrantOfAsylum.LAYOUT["seal-area"])
-    
-    # check note in faceRecognition.py
+
     @Document.field
+    def sealCheck(self) -> SealCheck:
+        return Document.checkSeals(
+            np.asarray(self.sealArea), GrantOfAsylum.BACKGROUNDS["seal-area"],
+            GrantOfAsylum.TAS.MOA_SEALS, GrantOfAsylum.BACKGROUNDS["seal-white"]
+        )
+    
+    # check note in faceRecognition.py.
+    # no picture tables are loaded yet, so this isn't parsed in background
+    @Document.field(prefetch = False)
     def face(self) -> Face:
         return Face.parse(self.docImg.crop(GrantOfAsylum.LAYOUT["picture"]), FaceType.GRANT_PICTURE)
     
@@ -124,10 +129,7 @@ class GrantOfAsylum(Document):
         return self.docImg.crop(GrantOfAsylum.LAYOUT["fingerprints"])
     
     def checkForgery(self) -> bool:        
-        return all(Document.checkNoSeal(
-            np.asarray(self.sealArea), GrantOfAsylum.BACKGROUNDS["seal-area"],
-            seal, GrantOfAsylum.BACKGROUNDS["seal-white"]
-        ) for seal in GrantOfAsylum.TAS.MOA_SEALS)
+        return not self.sealCheck.found
     
     def __repr__(self) -> str:
         return f"""==- Grant Of Asylum -==
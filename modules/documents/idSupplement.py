@@ -35,10 +35,6 @@ class IDSupplement(Document):
 
         IDSupplement.BACKGROUNDS["label"] = np.asarray(IDSupplement.BACKGROUNDS["label"])
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(IDSupplement.LAYOUT["label"])), IDSupplement.BACKGROUNDS["label"])
-    
     @Document.field
     def height(self) -> int:
         return int(parseText(
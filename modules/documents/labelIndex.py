@@ -0,0 +1,36 @@
+from PIL    import Image
+from typing import Generic, TypeVar
+import hashlib, numpy as np
+
+T = TypeVar("T")
+class LabelIndex(Generic[T]):
+    """Identifies documents by their label region with a few hash lookups.
+
+    Labels are grouped by their box, so each distinct box is cropped and hashed only once,
+    and only a hash hit gets compared pixel by pixel.
+    """
+
+    def __init__(self):
+        self.__boxes: dict[tuple[int, int, int, int], dict[bytes, list[tuple[np.ndarray, T]]]] = {}
+
+    @staticmethod
+    def hash(area: np.ndarray) -> bytes:
+        hash_ = hashlib.blake2b(digest_size = 16)
+        hash_.update(repr(area.shape).encode())
+        hash_.update(np.ascontiguousarray(area).data)
+        return hash_.digest()
+
+    def add(self, box: tuple[int, int, int, int], label: np.ndarray | Image.Image, target: T) -> None:
+        label = np.asarray(label)
+        self.__boxes.setdefault(box, {}).setdefault(LabelIndex.hash(label), []).append((label, target))
+
+    def find(self, docImg: Image.Image) -> T | None:
+        # boxes are probed in the order they were added, so earlier entries keep their priority
+        for box, labels in self.__boxes.items():
+            area = np.asarray(docImg.crop(box))
+
+            for label, target in labels.get(LabelIndex.hash(area), ()):
+                if np.array_equal(area, label):
+                    return target
+
+        return None
@@ -0,0 +1,53 @@
+from PIL    import Image
+from typing import Generic, Iterable, TypeVar
+import numpy as np
+
+from modules.templates import packPixels
+
+T = TypeVar("T")
+class PaletteClassifier(Generic[T]):
+    """Tells textures apart by the exact colors they're made of, wherever and however rotated they are.
+
+    Each texture is reduced to its palette when it's added. Classifying only counts how many
+    pixels of an image belong to each palette, so it takes a few comparisons per pixel.
+    """
+
+    def __init__(self, minCoverage: float = 0.25, minRatio: float = 4):
+        self.minCoverage = minCoverage # fraction of a texture's pixels that have to be seen
+        self.minRatio    = minRatio    # how much the best palette has to beat the second one by
+
+        self.__palettes: list[tuple[np.ndarray, int, T]] = []
+
+    def add(self, texture: np.ndarray | Image.Image, target: T) -> None:
+        pixels = packPixels(texture)
+        self.__palettes.append((np.unique(pixels), pixels.size, target))
+
+    def classify(self, img: np.ndarray | Image.Image, among: Iterable[T] | None = None) -> T | None:
+        """Finds the texture that appears in the image.
+
+        Args:
+            img: The image to look in. Black pixels are ignored, so it can be the output of bgFilter.
+            among: The targets that can appear. None allows all of them.
+
+        Returns:
+            The target of the texture, or None if no texture stands out enough.
+        """
+        img    = np.asarray(img)
+        pixels = packPixels(img)[img.any(axis = -1)]
+        if among is not None: among = tuple(among)
+
+        counts = []
+        for palette, size, target in self.__palettes:
+            if among is not None and target not in among: continue
+
+            count = sum(np.count_nonzero(pixels == color) for color in palette)
+            counts.append((count, size, target))
+
+        if not counts: return None
+        counts.sort(key = lambda c: c[0], reverse = True)
+
+        best, size, target = counts[0]
+        second = counts[1][0] if len(counts) > 1 else 0
+        if best < size * self.minCoverage or best < second * self.minRatio: return None
+
+        return target
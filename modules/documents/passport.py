@@ -138,8 +138,9 @@ class Passport(BaseDocument):
         else:
             return Sex(np.array_equal(Passport.TAS.SEX_F_GENERIC,  np.asarray(self.docImg.crop(self.type_.layout.sex))))
     
-    # check note in faceRecognition.py
-    @Document.field
+    # check note in faceRecognition.py.
+    # no picture tables are loaded yet, so this isn't parsed in background
+    @Document.field(prefetch = False)
     def face(self) -> Face:
         return Face.parse(self.docImg.crop(self.type_.layout.picture), FaceType.PASSPORT_PICTURE)
     
@@ -0,0 +1,133 @@
+from PIL    import Image
+from typing import Iterable, NamedTuple
+import cv2, numpy as np
+
+from modules.templates import Box
+
+class SealMatch(NamedTuple):
+    index: int # position of the seal in its bank
+    box:   Box
+    score: float
+
+class SealCheck:
+    """Result of looking for seals in a seal area. Keeps the filtered area, so other checks can reuse it."""
+
+    def __init__(self, filtered: np.ndarray, match: SealMatch | None):
+        self.filtered = filtered
+        self.match    = match
+
+    @property
+    def found(self) -> bool:
+        return self.match is not None
+
+    @property
+    def pos(self) -> tuple[int, int]:
+        """Position of the first pixel of whatever is stamped in the area. Raises IndexError if it's empty."""
+        ys, xs, _ = self.filtered.nonzero()
+        return (xs[0], ys[0])
+
+class SealBank:
+    """All the seals a document can have, matched against a seal area at once.
+
+    Every seal is correlated with the area in a single batch of FFTs. Scores are the same as
+    `cv2.TM_CCOEFF_NORMED` (what pyautogui uses), so the usual 0.999 confidence still applies.
+    """
+
+    def __init__(self, seals: Iterable[Image.Image], confidence: float = 0.999):
+        self.seals      = tuple(seals)
+        self.confidence = confidence
+
+        # zero mean templates, so the correlation doesn't depend on the brightness of the area
+        self.__templates = []
+        for seal in self.seals:
+            template = cv2.cvtColor(np.asarray(seal), cv2.COLOR_RGB2GRAY).astype(np.float64)
+            self.__templates.append(template - template.mean())
+
+        self.__norms   = np.array([(t * t).sum() for t in self.__templates])
+        self.__spectra: dict[tuple[int, int], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.seals)
+
+    @staticmethod
+    def __fftShape(shape: tuple[int, int]) -> tuple[int, int]:
+        # zero padding to sizes that factor well makes the transforms a lot faster,
+        # and doesn't change the correlation where seals fit in the area
+        return cv2.getOptimalDFTSize(shape[0]), cv2.getOptimalDFTSize(shape[1])
+
+    def __getSpectra(self, shape: tuple[int, int]) -> np.ndarray:
+        # seal areas always have the same size for a document, so this is only computed once
+        if shape not in self.__spectra:
+            stack = np.zeros((len(self.seals),) + shape, dtype = np.float32)
+            for i, template in enumerate(self.__templates):
+                if template.shape[0] <= shape[0] and template.shape[1] <= shape[1]:
+                    stack[i, :template.shape[0], :template.shape[1]] = template
+
+            self.__spectra[shape] = np.conj(np.fft.rfft2(stack))
+
+        return self.__spectra[shape]
+
+    @staticmethod
+    def __windowSums(integral: np.ndarray, h: int, w: int) -> np.ndarray:
+        return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+    def scores(self, area: np.ndarray) -> list[np.ndarray | None]:
+        """Returns the match score of each seal at each position of the area (None for seals that don't fit)."""
+        img = cv2.cvtColor(area, cv2.COLOR_RGB2GRAY).astype(np.float64)
+        H, W = img.shape
+
+        # single precision is plenty for scores compared against 0.999, and twice as fast
+        shape = SealBank.__fftShape(img.shape)
+        corr  = np.fft.irfft2(
+            np.fft.rfft2(img.astype(np.float32), s = shape)[np.newaxis] * self.__getSpectra(shape), s = shape
+        )
+
+        sums   = np.zeros((H + 1, W + 1))
+        sqSums = np.zeros((H + 1, W + 1))
+        np.cumsum(np.cumsum(img,       axis = 0), axis = 1, out = sums[1:, 1:])
+        np.cumsum(np.cumsum(img * img, axis = 0), axis = 1, out = sqSums[1:, 1:])
+
+        result = []
+        for i, template in enumerate(self.__templates):
+            h, w = template.shape
+            if h > H or w > W:
+                result.append(None)
+                continue
+
+            num  = corr[i, :H - h + 1, :W - w + 1]
+            win  = SealBank.__windowSums(sums, h, w)
+            var  = np.maximum(SealBank.__windowSums(sqSums, h, w) - win * win / (h * w), 0)
+            norm = np.sqrt(var * self.__norms[i])
+
+            # same handling of flat areas and rounding errors as opencv
+            with np.errstate(divide = "ignore", invalid = "ignore"):
+                result.append(np.where(
+                    np.abs(num) < norm, num / norm,
+                    np.where(np.abs(num) < norm * 1.125, np.sign(num), 0)
+                ))
+
+        return result
+
+    def match(self, area: np.ndarray, confidence: float | None = None) -> SealMatch | None:
+        """Finds the seal that best matches the area.
+
+        Args:
+            area: The filtered seal area, in RGB format.
+            confidence: Minimum match score. Defaults to the bank's.
+
+        Returns:
+            The best matching seal and where it is, or None if no seal matches well enough.
+        """
+        if confidence is None: confidence = self.confidence
+
+        best = None
+        for i, scores in enumerate(self.scores(area)):
+            if scores is None: continue
+
+            y, x  = np.unravel_index(np.argmax(scores), scores.shape)
+            score = float(scores[y, x])
+            if score > confidence and (best is None or score > best.score):
+                h, w = self.__templates[i].shape
+                best = SealMatch(i, Box(int(x), int(y), w, h), score)
+
+        return best
@@ -82,10 +82,6 @@ class VaxCert(Document):
         VaxCert.BACKGROUNDS["label"] = np.asarray(VaxCert.BACKGROUNDS["label"])
         Vaccine.load(VaxCert.BACKGROUNDS["vax-0"])
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(VaxCert.LAYOUT["label"])), VaxCert.BACKGROUNDS["label"])
-
     @Document.field
     def name(self) -> Name:
         return Name.fromPermitOrPass(parseText(
@@ -9,6 +9,7 @@ from modules.constants.screen   import *
 from modules.constants.delays   import *
 from modules.textRecognition    import parseDate, parseText
 from modules.documents.document import Document
+from modules.documents.seals    import SealBank, SealCheck
 from modules.utils              import *
 
 # not really necessary, but whatever
@@ -44,7 +45,7 @@ class WorkPass(Document):
     @staticmethod
     def load():
         sealsPath = os.path.join(WorkPass.TAS.ASSETS, "papers", "workPass", "seals")
-        WorkPass.SEALS = tuple(
+        WorkPass.SEALS = SealBank(
             Image.open(os.path.join(sealsPath, file)).convert("RGB") 
             for file in os.listdir(sealsPath)
         )
@@ -61,10 +62,6 @@ class WorkPass(Document):
         sealWhiteBg.paste((255, 255, 255), (0, 0) + sealWhiteBg.size)
         WorkPass.BACKGROUNDS["seal-white"] = sealWhiteBg
 
-    @staticmethod
-    def checkMatch(docImg: Image.Image) -> bool:
-        return np.array_equal(np.asarray(docImg.crop(WorkPass.LAYOUT["label"])), WorkPass.BACKGROUNDS["label"])
-    
     @Document.field
     def name(self) -> Name:
         return Name.fromPermitOrPass(parseText(
@@ -92,13 +89,17 @@ class WorkPass(Document):
     def sealArea(self) -> Image.Image:
         return self.docImg.crop(WorkPass.LAYOUT["seal-area"])
 
+    @Document.field
+    def sealCheck(self) -> SealCheck:
+        return Document.checkSeals(
+            np.asarray(self.sealArea), WorkPass.BACKGROUNDS["seal-area"],
+            WorkPass.SEALS, WorkPass.BACKGROUNDS["seal-white"]
+        )
+
     def checkForgery(self, date: date) -> bool:
         if date < WorkPass.TAS.DAY_11: return False
 
-        return all(Document.checkNoSeal(
-            np.asarray(self.sealArea), WorkPass.BACKGROUNDS["seal-area"],
-            seal, WorkPass.BACKGROUNDS["seal-white"]
-        ) for seal in WorkPass.SEALS)
+        return not self.sealCheck.found
     
     def __repr__(self) -> str:
         return f"""==- Work Pass -==
@@ -8,10 +8,11 @@ from PIL     import Image
 from enum    import Enum
 from hashlib import md5
 from typing  import Self, Type, ClassVar, TYPE_CHECKING
-import os, numpy as np
+import os, struct, hashlib, numpy as np
 
 from modules.constants.other    import Description, Sex, TASException
 from modules.documents.document import BaseDocument
+from modules.templates          import packPixels
 from modules.utils              import *
 
 import logging
@@ -29,15 +30,104 @@ HEAD_MASK      = 0x001F
 EYES_BITS      = 5
 EYES_MASK      = 0x03E0
 NOSEMOUTH_BITS = 5
-NOSEMOUTH_MASK = 0x7B00
+NOSEMOUTH_MASK = 0x7C00
 SEX_MASK       = 0x8000
 
+# tables are arrays of these records, sorted by key. the unsorted ".ptbt" files have the same layout
+FACE_RECORD = np.dtype([("key", f"S{MD5_BYTES}"), ("value", f">u{DATA_BYTES}")])
+SORTED_TABLE_EXT   = ".ptbs"
+UNSORTED_TABLE_EXT = ".ptbt"
+
+# sorted tables start with a header: magic, version, record size, record count and sha256 of the records
+TABLE_MAGIC   = b"PTBS"
+TABLE_VERSION = 1
+TABLE_HEADER  = struct.Struct("<4sHHQ32s")
+
 class FaceType(Enum):
     PERSON, PASSPORT_PICTURE, ID_PICTURE, GRANT_PICTURE, WANTED_PICTURE = "people", "passport", "id", "grant", ""
 
 class FacePiece(Enum):
     NOSE_MOUTH, EYES, HEAD = "noseMouth", "eyes", "head"
 
+class FaceTable:
+    """Lookup table of faces, memory-mapped from disk and binary searched.
+
+    Only the pages touched by lookups get loaded, so opening a table is instant
+    and memory usage doesn't depend on its size. Faces are only created for hits.
+    """
+
+    def __init__(self, records: np.ndarray):
+        self.records  = records
+        self.keys     = records["key"]
+        self.checksum = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @staticmethod
+    def sort(records: np.ndarray) -> np.ndarray:
+        return records[np.argsort(records["key"], kind = "stable")]
+
+    @staticmethod
+    def digest(records: np.ndarray) -> bytes:
+        hasher = hashlib.sha256()
+
+        # in chunks, so memory-mapped tables don't get loaded all at once
+        for i in range(0, len(records), 1 << 20):
+            hasher.update(records[i:i + (1 << 20)].tobytes())
+
+        return hasher.digest()
+
+    @staticmethod
+    def write(records: np.ndarray, file: str) -> None:
+        """Saves sorted records as a table file, header included.
+        The file only gets replaced once it's complete, so an interrupted write can't leave a broken table behind."""
+        tmpFile = file + ".tmp"
+        try:
+            with open(tmpFile, "wb") as f:
+                f.write(TABLE_HEADER.pack(
+                    TABLE_MAGIC, TABLE_VERSION, FACE_RECORD.itemsize, len(records), FaceTable.digest(records)
+                ))
+                records.astype(FACE_RECORD, copy = False).tofile(f)
+
+            os.replace(tmpFile, file)
+        except BaseException:
+            if os.path.exists(tmpFile): os.remove(tmpFile)
+            raise
+
+    @staticmethod
+    def open(file: str) -> "FaceTable":
+        with open(file, "rb") as f:
+            header = f.read(TABLE_HEADER.size)
+
+        if len(header) != TABLE_HEADER.size:
+            raise TASException("Invalid table file (missing header)")
+
+        magic, version, recordSize, count, checksum = TABLE_HEADER.unpack(header)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION or recordSize != FACE_RECORD.itemsize:
+            raise TASException("Invalid table file (unknown format)")
+        if os.path.getsize(file) != TABLE_HEADER.size + count * FACE_RECORD.itemsize:
+            raise TASException("Invalid table file (wrong size)")
+
+        if count == 0: table = FaceTable(np.zeros(0, FACE_RECORD))
+        else:          table = FaceTable(np.memmap(file, FACE_RECORD, "r", offset = TABLE_HEADER.size, shape = (count,)))
+
+        table.checksum = checksum
+        return table
+
+    def verify(self) -> bool:
+        """Checks the records against the digest in the header, and that they're sorted.
+        This reads the whole table, so it's left to the tools instead of being done on load."""
+        if self.checksum is None or FaceTable.digest(self.records) != self.checksum: return False
+        return bool((self.keys[1:] >= self.keys[:-1]).all())
+
+    def get(self, key: bytes) -> "Face | None":
+        i = np.searchsorted(self.keys, key)
+
+        # numpy drops trailing null bytes from keys, so they're compared the same way
+        if i == len(self.keys) or self.keys[i] != key.rstrip(b"\0"): return None
+        return Face.fromPacked(int(self.records["value"][i]))
+
 class Face:
     TAS: ClassVar[Type["TAS"]] = None
 
@@ -78,6 +168,16 @@ class Face:
         }
     }
 
+    # the same colors, packed like packPixels does, so getPalette can look for all of them at once
+    RECON_CODES: ClassVar[tuple[int, ...]] = tuple(packPixels(np.array([RECON_COLORS], dtype = np.uint8))[0].tolist())
+    DOUBT_CODES: ClassVar[dict[int, dict[int, int]]] = {
+        idx: dict(zip(packPixels(np.array([list(doubt.keys())], dtype = np.uint8))[0].tolist(), doubt.values()))
+        for idx, doubt in PALETTE_DOUBT.items()
+    }
+    PALETTE_CODES: ClassVar[np.ndarray] = np.unique(
+        np.array(RECON_CODES + tuple(code for doubt in DOUBT_CODES.values() for code in doubt), dtype = np.uint32)
+    )
+
     PARTS_DESCRIPTIONS: ClassVar[dict[FacePiece, dict[Sex, dict[int, Description]]]] = {
         FacePiece.NOSE_MOUTH: {
             Sex.F: {},
@@ -152,28 +252,57 @@ class Face:
         Sex.F: (10, 3, -7, -6, 3, 5, 2, 0, 4, 2, 5, 13, 9, 5, 8, 14, 5, 3, 7, 23)
     }
 
-    TABLES: ClassVar[dict[FaceType, dict[bytes, Self]]] = {}
+    TABLES: ClassVar[dict[FaceType, FaceTable]] = {}
 
     @staticmethod
-    def loadTable(file: str) -> dict[bytes, Self]:
-        result = {}
-        with open(file, "rb") as f:
-            while True:
-                key = f.read(MD5_BYTES)
-                if not key: break
-                value = f.read(DATA_BYTES)
-                if not value:
-                    raise TASException("Invalid table file (key with no value)")
-                
-                value = int.from_bytes(value)
-                result[key] = Face(
-                    head      =  value &      HEAD_MASK,
-                    eyes      = (value &      EYES_MASK) >>  HEAD_BITS,
-                    noseMouth = (value & NOSEMOUTH_MASK) >> (EYES_BITS + HEAD_BITS),
-                    sex       = Sex(bool(value & SEX_MASK)) 
-                )
+    def fromPacked(value: int) -> Self:
+        return Face(
+            head      =  value &      HEAD_MASK,
+            eyes      = (value &      EYES_MASK) >>  HEAD_BITS,
+            noseMouth = (value & NOSEMOUTH_MASK) >> (EYES_BITS + HEAD_BITS),
+            sex       = Sex(bool(value & SEX_MASK)) 
+        )
+
+    def toPacked(self) -> int:
+        return (
+            self.head | (self.eyes << HEAD_BITS) | (self.noseMouth << (EYES_BITS + HEAD_BITS)) |
+            (SEX_MASK if self.sex.value else 0)
+        )
 
-        return result
+    @staticmethod
+    def loadTable(file: str) -> FaceTable:
+        """Opens a lookup table. `file` is the path without extension.
+
+        Sorted tables are memory-mapped as they are. Unsorted ones get sorted and saved next to
+        the original the first time, so this only happens once. The sorted table is made again
+        if the unsorted one is newer, or if it can't be opened.
+        """
+        sortedFile   = file + SORTED_TABLE_EXT
+        unsortedFile = file + UNSORTED_TABLE_EXT
+        if os.path.exists(sortedFile):
+            if not os.path.exists(unsortedFile): return FaceTable.open(sortedFile)
+
+            if os.path.getmtime(sortedFile) < os.path.getmtime(unsortedFile):
+                logger.info(f'Lookup table "{unsortedFile}" was updated')
+            else:
+                try:
+                    return FaceTable.open(sortedFile)
+                except TASException as e:
+                    logger.warning(f'Unable to open sorted lookup table "{sortedFile}", sorting it again: {e}')
+
+        if os.path.getsize(unsortedFile) % FACE_RECORD.itemsize != 0:
+            raise TASException("Invalid table file (key with no value)")
+
+        logger.info(f'Sorting lookup table "{unsortedFile}"...')
+        records = FaceTable.sort(np.fromfile(unsortedFile, FACE_RECORD))
+
+        try:
+            FaceTable.write(records, sortedFile)
+        except OSError as e:
+            logger.warning(f'Unable to write sorted lookup table "{sortedFile}", keeping it in memory: {e}')
+            return FaceTable(records)
+
+        return FaceTable.open(sortedFile)
 
     @staticmethod
     def load() -> None:
@@ -183,7 +312,7 @@ class Face:
             if type_ != FaceType.PERSON: continue # TODO add pictures tables
             
             logger.info(f"Loading lookup table for {type_}...")
-            Face.TABLES[type_] = Face.loadTable(os.path.join(Face.TAS.ASSETS, "faces", f"{type_.value}.ptbt"))
+            Face.TABLES[type_] = Face.loadTable(os.path.join(Face.TAS.ASSETS, "faces", type_.value))
 
         # these are the same, so we just use the same table for both
         # Face.TABLES[FaceType.WANTED_PICTURE] = Face.TABLES[FaceType.ID_PICTURE] # TODO add pictures tables
@@ -192,25 +321,19 @@ class Face:
     def getHeightFromY(y: float, hairHeight: int) -> float:
         return round((y - hairHeight) * Face.CM_PER_PIXEL + Face.MIN_HEIGHT, 2)
     
-    @staticmethod
-    def __checkMask(color: tuple[int, int, int], img: np.ndarray) -> bool:
-        return len(np.where((img == np.asarray(color, dtype = np.uint8)).all(axis = -1))[0]) != 0
-            
     @staticmethod
     def getPalette(img: Image.Image) -> int | None:
-        imgData = np.asarray(img)
-
-        idx = None
-        for i, color in enumerate(Face.RECON_COLORS):
-            if Face.__checkMask(color, imgData):
-                idx = i
-                break
-        else: return None
+        # a single pass finds which of the colors we care about are in the image,
+        # then the palette is resolved from those in the same order as before
+        pixels  = packPixels(img)
+        present = set(np.unique(pixels[np.isin(pixels, Face.PALETTE_CODES)]).tolist())
+
+        idx = next((i for i, code in enumerate(Face.RECON_CODES) if code in present), None)
+        if idx is None: return None
         
-        if idx in Face.PALETTE_DOUBT:
-            for color in Face.PALETTE_DOUBT[idx].keys():
-                if Face.__checkMask(color, imgData):
-                    return Face.PALETTE_DOUBT[idx][color]
+        if idx in Face.DOUBT_CODES:
+            for code, palette in Face.DOUBT_CODES[idx].items():
+                if code in present: return palette
                 
         return idx
     
@@ -269,14 +392,18 @@ class Face:
         return halfImage(img)
 
     @staticmethod
-    def parse(img: Image.Image, type_: FaceType) -> Self | None:
+    def normalize(img: Image.Image, type_: FaceType) -> tuple[Image.Image | None, int | None]:
+        """Turns a face as it appears in game into what the lookup tables are keyed on.
+
+        Returns the normalized image (None if it can't be used) and, for people, their height in pixels.
+        """
         img = Face.fixImage(img)
         
         heightPx = None
         match type_:
             case FaceType.PERSON:
                 palette = Face.getPalette(img)
-                if palette is None: return None
+                if palette is None: return None, None
                 fixed, topY = Face.maskCropFace(Face.toBasePalette(img, palette)) 
                 heightPx = img.size[1] - topY
             case FaceType.GRANT_PICTURE:
@@ -289,10 +416,21 @@ class Face:
 
                 fixed = Face.cropHighest(img, Face.ORIGINAL_FG_COLOR, Face.ID_WANTED_CROP_AMT) 
 
-        face = Face.TABLES[type_].get(md5(fixed.tobytes()).digest())
+        return fixed, heightPx
+
+    @staticmethod
+    def hashImage(img: Image.Image) -> bytes:
+        return md5(img.tobytes()).digest()
+
+    @staticmethod
+    def parse(img: Image.Image, type_: FaceType) -> Self | None:
+        fixed, heightPx = Face.normalize(img, type_)
+        if fixed is None: return None
+
+        face = Face.TABLES[type_].get(Face.hashImage(fixed))
 
         if face is None:
-            face = Face.TABLES[type_].get(md5(fixed.transpose(Image.FLIP_LEFT_RIGHT).tobytes()).digest())
+            face = Face.TABLES[type_].get(Face.hashImage(fixed.transpose(Image.FLIP_LEFT_RIGHT)))
         
         if heightPx is not None:
             if face is None: return None
@@ -1,4 +1,6 @@
-import time
+from typing import Callable
+from PIL    import Image
+import time, numpy as np
 import logging
 
 logger = logging.getLogger('tas.' + __name__)
@@ -14,16 +16,104 @@ class Frames:
         self.start_time = time.perf_counter()
 
     def get_frame(self) -> int:
-        return int((time.perf_counter() - self.start_time) * Frames.FRAME_RATE)
+        return int(self.now())
+
+    def now(self) -> float:
+        """Current frame, including how much of it already passed."""
+        return (time.perf_counter() - self.start_time) * Frames.FRAME_RATE
+
+    def frame_time(self, frame: float) -> float:
+        """The time (as in `time.perf_counter`) at which a frame starts."""
+        return frame / Frames.FRAME_RATE + self.start_time
 
     def sleep(self, frames: int):
         sleep_frame = self.get_frame() + frames
         self.sleep_to(sleep_frame)
 
     def sleep_to(self, frame: int):
-        sleep_end = (frame / 60) + self.start_time
+        sleep_end = self.frame_time(frame)
         current_time = time.perf_counter()
         while current_time < sleep_end:
             current_time = time.perf_counter()
         if current_time > sleep_end + 0.005:
-            logger.debug(f'Slept extra {sleep_end - current_time} seconds')
\ No newline at end of file
+            logger.debug(f'Slept extra {sleep_end - current_time} seconds')
+
+class Settled:
+    """Tells when an animation in an area is over: the area has to change, then stay the same for a few frames in a row.
+
+    Meant to be called once per frame with captures of the same area, starting right after whatever starts the animation.
+    """
+
+    def __init__(self, frames: int):
+        self.frames = frames
+        self.__last  = None
+        self.__moved = False
+        self.__still = 0
+
+    def __call__(self, area: np.ndarray) -> bool:
+        if self.__last is not None:
+            if np.array_equal(area, self.__last): self.__still += 1
+            else:
+                self.__still = 0
+                self.__moved = True
+
+        self.__last = area
+        return self.__moved and self.__still >= self.frames
+
+class FrameCache:
+    """Keeps the captures taken during the current frame, so every read within it gets the same image.
+
+    The game can't draw anything new until the next frame, unless some input is sent,
+    in which case the owner should call `invalidate`.
+    """
+
+    def __init__(self, frames: Frames | None = None):
+        self.frames = Frames() if frames is None else frames
+        self.grabs  = 0
+        self.hits   = 0
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self.__frame   = -1
+        self.__screen  = None
+        self.__regions = {}
+
+    def __sync(self) -> None:
+        frame = self.frames.get_frame()
+        if frame != self.__frame:
+            self.invalidate()
+            self.__frame = frame
+
+    def screen(self, grab: Callable[[], Image.Image]) -> Image.Image:
+        """Returns the capture of the whole window for this frame, taking it with `grab` if there's none yet."""
+        self.__sync()
+
+        if self.__screen is None:
+            self.grabs += 1
+            self.__screen = grab()
+        else: self.hits += 1
+
+        return self.__screen
+
+    def region(
+        self, box: tuple[int, int, int, int],
+        grab: Callable[[tuple[int, int, int, int]], Image.Image]
+    ) -> Image.Image:
+        """Returns the capture of an area for this frame, cropping it from the whole window if that was already taken."""
+        self.__sync()
+
+        if self.__screen is not None:
+            self.hits += 1
+            return self.__screen.crop(box)
+
+        if box not in self.__regions:
+            self.grabs += 1
+            self.__regions[box] = grab(box)
+        else: self.hits += 1
+
+        return self.__regions[box]
+
+    def stats(self) -> str:
+        total = self.grabs + self.hits
+        rate  = 0 if total == 0 else self.hits / total * 100
+        return f"Frame cache: {self.grabs} grabs, {self.hits} reused ({rate:.1f}% reuse rate)"
@@ -0,0 +1,361 @@
+from typing      import Callable
+from collections import defaultdict
+import time, platform
+
+import logging
+
+from modules.frames import Frames
+
+logger = logging.getLogger('tas.' + __name__)
+
+# an action ("move", "down" or "up") and its arguments
+Event = tuple[str, tuple[int, ...]]
+
+class InputBackend:
+    """Moves the mouse and presses its left button, right away and without any pause."""
+
+    def moveTo(self, x: int, y: int) -> None: raise NotImplementedError
+    def mouseDown(self) -> None: raise NotImplementedError
+    def mouseUp(self) -> None: raise NotImplementedError
+
+    def send(self, events: list[Event]) -> None:
+        """Sends several actions in a row. Backends that can should send them all at once."""
+        for action, args in events:
+            match action:
+                case "move": self.moveTo(*args)
+                case "down": self.mouseDown()
+                case "up":   self.mouseUp()
+
+class PyAutoGUIBackend(InputBackend):
+    def __init__(self):
+        import pyautogui as pg
+        self.pg = pg
+
+    # _pause skips the global pause pyautogui sleeps for after every call
+    def moveTo(self, x: int, y: int) -> None:
+        self.pg.moveTo(x, y, _pause = False)
+
+    def mouseDown(self) -> None:
+        self.pg.mouseDown(_pause = False)
+
+    def mouseUp(self) -> None:
+        self.pg.mouseUp(_pause = False)
+
+class XTestBackend(InputBackend):
+    """Sends events straight to the X server (python-xlib comes with pyautogui on Linux)."""
+
+    def __init__(self):
+        from Xlib      import X, display
+        from Xlib.ext  import xtest
+        from pyautogui import FailSafeException
+
+        self.X       = X
+        self.xtest   = xtest
+        self.display = display.Display()
+        self.root    = self.display.screen().root
+        self.failSafeException = FailSafeException
+
+        geometry = self.root.get_geometry()
+        self.corners = {
+            (0, 0), (geometry.width - 1, 0), (0, geometry.height - 1), (geometry.width - 1, geometry.height - 1)
+        }
+
+    def __failSafe(self) -> None:
+        # same as pyautogui: moving the mouse into a corner stops the bot
+        pointer = self.root.query_pointer()
+        if (pointer.root_x, pointer.root_y) in self.corners:
+            raise self.failSafeException("Fail-safe triggered from mouse moving to a corner of the screen")
+
+    def __fake(self, action: str, args: tuple[int, ...]) -> None:
+        match action:
+            case "move": self.xtest.fake_input(self.display, self.X.MotionNotify, x = args[0], y = args[1])
+            case "down": self.xtest.fake_input(self.display, self.X.ButtonPress,   detail = 1)
+            case "up":   self.xtest.fake_input(self.display, self.X.ButtonRelease, detail = 1)
+
+    def send(self, events: list[Event]) -> None:
+        # everything goes out in a single round trip to the server
+        self.__failSafe()
+        for action, args in events:
+            self.__fake(action, args)
+
+        self.display.sync()
+
+    def moveTo(self, x: int, y: int) -> None:
+        self.send([("move", (x, y))])
+
+    def mouseDown(self) -> None:
+        self.send([("down", ())])
+
+    def mouseUp(self) -> None:
+        self.send([("up", ())])
+
+def getBackend() -> InputBackend:
+    if platform.system() == "Linux":
+        try:
+            backend = XTestBackend()
+            logger.info("using XTest input")
+            return backend
+        except Exception as e:
+            logger.warning(f"XTest input unavailable, falling back to pyautogui: {e}")
+
+    return PyAutoGUIBackend()
+
+class Gesture:
+    """A scripted sequence of mouse actions, to be sent with `InputEngine.play`.
+
+    Waits are counted in game frames. Actions that end up on the same frame get sent to the backend together.
+    All methods return the gesture itself, so calls can be chained.
+    """
+
+    def __init__(
+        self, offset: Callable[[int, int], tuple[int, int]] | None = None, *,
+        dragHold: int = 1, dragRelease: int = 0
+    ):
+        """
+        Args:
+            offset: Converts points given to the gesture to screen coordinates.
+            dragHold: Frames to wait before releasing a drag, so the game sees the document where it's dropped.
+            dragRelease: Frames to wait after releasing a drag.
+        """
+        self.offset      = offset
+        self.dragHold    = dragHold
+        self.dragRelease = dragRelease
+        self.steps: list[Event | tuple[str, Callable[[], None]]] = []
+
+    def moveTo(self, at: tuple[int, int]) -> "Gesture":
+        self.steps.append(("move", tuple(at) if self.offset is None else self.offset(*at)))
+        return self
+
+    def down(self) -> "Gesture":
+        self.steps.append(("down", ()))
+        return self
+
+    def up(self) -> "Gesture":
+        self.steps.append(("up", ()))
+        return self
+
+    def wait(self, frames: int) -> "Gesture":
+        """Waits at least this many frames after the last action before the next one."""
+        self.steps.append(("wait", (frames,)))
+        return self
+
+    def then(self, fn: Callable[[], None]) -> "Gesture":
+        """Calls `fn` once the actions before it were sent, like to wait for something on screen.
+        Scheduling starts over once it returns."""
+        self.steps.append(("then", fn))
+        return self
+
+    def click(self, at: tuple[int, int]) -> "Gesture":
+        return self.moveTo(at).down().up()
+
+    def dragTo(self, at: tuple[int, int]) -> "Gesture":
+        """Drags from wherever the mouse is at this point of the gesture."""
+        return self.down().moveTo(at).wait(self.dragHold).up().wait(self.dragRelease)
+
+    def split(self) -> list[tuple["Gesture", Callable[[], None] | None]]:
+        """Splits the gesture where it calls something, returning each part and what gets called after it."""
+        parts = [(Gesture(self.offset, dragHold = self.dragHold, dragRelease = self.dragRelease), None)]
+        for step in self.steps:
+            if step[0] == "then":
+                parts[-1] = (parts[-1][0], step[1])
+                parts.append((Gesture(self.offset, dragHold = self.dragHold, dragRelease = self.dragRelease), None))
+            else: parts[-1][0].steps.append(step)
+
+        return parts
+
+    def compile(self, settleFrames: dict[str, int]) -> tuple[list[tuple[int, list[Event]]], int]:
+        """Schedules the actions, each after the settle time of the previous one or the waits in between, whichever is longer.
+        Gestures that call something have to be split first.
+
+        Returns:
+            The frame of each batch of actions, counting from the start of the gesture, and the frame at which it ends.
+        """
+        batches: list[tuple[int, list[Event]]] = []
+
+        last   = 0
+        settle = 0
+        waited = 0
+        for action, args in self.steps:
+            if action == "wait":
+                waited += args[0]
+                continue
+
+            frame = last + max(settle, waited)
+            if batches and batches[-1][0] == frame: batches[-1][1].append((action, args))
+            else:                                   batches.append((frame, [(action, args)]))
+
+            last   = frame
+            settle = settleFrames[action]
+            waited = 0
+
+        return batches, last + waited
+
+class InputEngine:
+    """Sends mouse input, making sure the game had time to see each action.
+
+    Every kind of action has a minimum settle time. Instead of sleeping right after an action,
+    the remaining time is waited for before the next action or screen capture, so work done
+    in between isn't wasted. Waits are logged, and totals are kept for each kind of action.
+
+    The position of the mouse and the state of its button are tracked, so actions that wouldn't
+    change anything (moving where the mouse already is, releasing a released button) never get sent.
+    """
+
+    def __init__(
+        self, backend: InputBackend, settleTimes: dict[str, float],
+        settleFrames: dict[str, int], frames: Frames
+    ):
+        self.backend      = backend
+        self.settleTimes  = settleTimes
+        self.settleFrames = settleFrames # used within gestures instead
+        self.frames       = frames
+
+        # None until the first action, since the mouse could be anywhere
+        self.pos:     tuple[int, int] | None = None
+        self.pressed: bool | None            = None
+
+        self.__last     = None
+        self.__deadline = 0.0
+        self.__pending: tuple[int, int] | None = None
+        self.__waits: defaultdict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+
+        # actions that never got sent, by kind, since the last resetStats (once a day), and in the whole run
+        self.dropped: defaultdict[str, int] = defaultdict(int)
+        self.totalDropped = 0
+
+    def settle(self) -> None:
+        """Waits until the game had time to see the last action."""
+        wait = self.__deadline - time.perf_counter()
+        if wait <= 0: return
+
+        time.sleep(wait)
+        stats = self.__waits[self.__last]
+        stats[0] += 1
+        stats[1] += wait
+        logger.debug(f'waited {wait * 1000:.1f}ms after "{self.__last}"')
+
+    def __drop(self, action: str) -> None:
+        self.dropped[action] += 1
+        self.totalDropped    += 1
+
+    def __redundant(self, action: str, args: tuple[int, ...]) -> bool:
+        match action:
+            case "move": return self.pos == args
+            case "down": return self.pressed is True
+            case "up":   return self.pressed is False
+
+    def __track(self, action: str, args: tuple[int, ...]) -> None:
+        match action:
+            case "move": self.pos     = args
+            case "down": self.pressed = True
+            case "up":   self.pressed = False
+
+    def __do(self, action: str, args: tuple[int, ...] = ()) -> None:
+        if action != "move": self.flush() # presses happen where the mouse is
+        elif self.__pending is not None:
+            self.__pending = None
+            self.__drop("move")
+
+        if self.__redundant(action, args):
+            self.__drop(action)
+            return
+
+        self.settle()
+        self.backend.send([(action, args)])
+        self.__track(action, args)
+        self.__last     = action
+        self.__deadline = time.perf_counter() + self.settleTimes[action]
+
+    def moveTo(self, x: int, y: int) -> None:
+        self.__do("move", (x, y))
+
+    def moveAway(self, x: int, y: int) -> None:
+        """Moves the mouse out of the way of the next capture.
+
+        The move is held back until `flush` gets called before a capture, or until the next press.
+        If the mouse gets moved somewhere else first, it's never sent.
+        """
+        if self.__pending is not None: self.__drop("move")
+
+        if self.pos == (x, y) and self.__pending is None: self.__drop("move")
+        else:                                             self.__pending = (x, y)
+
+    def flush(self) -> bool:
+        """Sends the move held back by `moveAway`, if there's one. Returns whether anything was sent."""
+        if self.__pending is None: return False
+
+        pos, self.__pending = self.__pending, None
+        sent = self.pos != pos
+        self.__do("move", pos)
+        return sent
+
+    def mouseDown(self) -> None:
+        self.__do("down")
+
+    def mouseUp(self) -> None:
+        self.__do("up")
+
+    def __filter(self, events: list[Event]) -> list[Event]:
+        # drops what wouldn't change anything. moves on the same frame only need the last one
+        result = []
+        for action, args in events:
+            if self.__redundant(action, args):
+                self.__drop(action)
+                continue
+
+            if action == "move" and result and result[-1][0] == "move":
+                result.pop()
+                self.__drop("move")
+
+            result.append((action, args))
+            self.__track(action, args)
+
+        return result
+
+    def play(self, gesture: Gesture) -> None:
+        """Sends a gesture, following the game's frames. The wait after its last action is left for later, as usual."""
+        for part, then in gesture.split():
+            self.__play(part)
+            if then is not None:
+                self.settle()
+                then()
+
+    def __play(self, gesture: Gesture) -> None:
+        batches, length = gesture.compile(self.settleFrames)
+
+        # a held back move is only needed if the gesture doesn't start by moving somewhere else
+        if batches and batches[0][0] == 0 and batches[0][1][0][0] == "move" and self.__pending is not None:
+            self.__pending = None
+            self.__drop("move")
+        else: self.flush()
+
+        self.settle()
+        start = self.frames.now()
+        sent  = False
+        for frame, events in batches:
+            events = self.__filter(events)
+            if not events: continue
+
+            self.frames.sleep_to(start + frame)
+            self.backend.send(events)
+            self.__last = events[-1][0]
+            sent        = True
+
+        deadline = self.frames.frame_time(start + length)
+        if sent: deadline = max(deadline, time.perf_counter() + self.settleTimes[self.__last])
+        self.__deadline = max(self.__deadline, deadline)
+
+    def stats(self) -> str:
+        waits = ", ".join(
+            f'"{action}": {count} waits, {total:.2f}s' for action, (count, total) in sorted(self.__waits.items())
+        )
+        return f"Input: {waits or 'no waits'}"
+
+    def droppedStats(self) -> str:
+        dropped = ", ".join(f'"{action}": {count}' for action, count in sorted(self.dropped.items()))
+        return f"Input: dropped {dropped or 'nothing'} ({self.totalDropped} this run)"
+
+    def resetStats(self) -> None:
+        """Starts counting waits and dropped actions again, keeping the run total."""
+        self.__waits.clear()
+        self.dropped.clear()
@@ -1,11 +1,12 @@
 from abc    import ABC, abstractmethod
 from typing import TYPE_CHECKING
-import time, pyautogui as pg, numpy as np
+import time, numpy as np
 
 from modules.constants.delays import *
 from modules.constants.screen import *
 from modules.constants.other  import *
 from modules.utils            import *
+from modules.templates        import locate
 
 from modules.documents.document       import Document
 from modules.documents.entryTicket    import EntryTicket
@@ -99,10 +100,7 @@ class Run(ABC):
                 self.tas.click(leftSlot(self.tas.getRulebook()["documents"]["access-permit"]["document-must-have-seal"]))
             else:
                 try:
-                    pos = Document.sealPos(
-                        np.asarray(doc.sealArea), AccessPermit.BACKGROUNDS["seal-area"],
-                        AccessPermit.BACKGROUNDS["seal-white"]
-                    )
+                    pos = doc.sealCheck.pos
                 except:
                     self.tas.click(onTable(rightSlot(centerOf(doc.getTableBox("seal-area")))))
                     self.tas.click(leftSlot(self.tas.getRulebook()["documents"]["access-permit"]["document-must-have-seal"]))
@@ -132,7 +130,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.MATCHING_DATA, msg) is None:
+            if locate(self.tas.MATCHING_DATA, msg) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 self.tas.moveTo(PAPER_SCAN_POS)
@@ -143,7 +141,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None:
+            if locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 self.tas.moveTo(PAPER_SCAN_POS)
@@ -173,7 +171,7 @@ class Run(ABC):
                 time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
                 msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
                 
-                if pg.locate(self.tas.MATCHING_DATA, msg) is None:
+                if locate(self.tas.MATCHING_DATA, msg) is None:
                     self.tas.click(INSPECT_BUTTON)
                     time.sleep(INSPECT_ALPHACHANGE_TIME)
                     self.tas.moveTo(PAPER_SCAN_POS)
@@ -187,7 +185,7 @@ class Run(ABC):
                 self.tas.click(INSPECT_BUTTON)
                 time.sleep(INSPECT_ALPHACHANGE_TIME)
                 self.tas.moveTo(PAPER_SCAN_POS)
-                return pg.locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None
+                return locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None
 
             return False
         
@@ -247,7 +245,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
             
-            if pg.locate(self.tas.MATCHING_DATA, msg) is None:
+            if locate(self.tas.MATCHING_DATA, msg) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 self.tas.moveTo(PAPER_SCAN_POS)
@@ -258,7 +256,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None:
+            if locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 self.tas.moveTo(PAPER_SCAN_POS)
@@ -396,10 +394,7 @@ class Run(ABC):
                 self.tas.click(leftSlot(self.tas.getRulebook()["documents"]["entry-permit"]["document-must-have-seal"]))
             else:
                 try:
-                    pos = Document.sealPos(
-                        np.asarray(doc.sealArea), EntryPermit.BACKGROUNDS["seal-area"],
-                        EntryPermit.BACKGROUNDS["seal-white"]
-                    )
+                    pos = doc.sealCheck.pos
                 except:
                     self.tas.click(onTable(rightSlot(centerOf(doc.getTableBox("seal-area")))))
                     self.tas.click(leftSlot(self.tas.getRulebook()["documents"]["entry-permit"]["document-must-have-seal"]))
@@ -468,10 +463,7 @@ class Run(ABC):
                 self.tas.click(leftSlot(self.tas.getRulebook()["documents"]["grant-asylum"]["document-must-have-seal"]))
             else:
                 try:
-                    pos = Document.sealPos(
-                        np.asarray(doc.sealArea), GrantOfAsylum.BACKGROUNDS["seal-area"],
-                        GrantOfAsylum.BACKGROUNDS["seal-white"]
-                    )
+                    pos = doc.sealCheck.pos
                 except:
                     self.tas.click(onTable(rightSlot(centerOf(doc.getTableBox("seal-area")))))
                     self.tas.click(leftSlot(self.tas.getRulebook()["documents"]["grant-asylum"]["document-must-have-seal"]))
@@ -501,7 +493,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.MATCHING_DATA, msg) is None:
+            if locate(self.tas.MATCHING_DATA, msg) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 self.tas.moveTo(PAPER_SCAN_POS)
@@ -512,7 +504,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None:
+            if locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 self.tas.moveTo(PAPER_SCAN_POS)
@@ -544,7 +536,7 @@ class Run(ABC):
                 time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
                 msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-                if pg.locate(self.tas.MATCHING_DATA, msg) is None:
+                if locate(self.tas.MATCHING_DATA, msg) is None:
                     self.tas.click(INSPECT_BUTTON)
                     time.sleep(INSPECT_ALPHACHANGE_TIME)
                     self.tas.moveTo(PAPER_SCAN_POS)
@@ -558,7 +550,7 @@ class Run(ABC):
                 self.tas.click(INSPECT_BUTTON)
                 time.sleep(INSPECT_ALPHACHANGE_TIME)
                 self.tas.moveTo(PAPER_SCAN_POS)
-                return pg.locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None
+                return locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None
             
             return False
     
@@ -589,7 +581,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.MATCHING_DATA, msg) is None:
+            if locate(self.tas.MATCHING_DATA, msg) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 self.tas.moveTo(PAPER_SCAN_POS)
@@ -600,7 +592,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None:
+            if locate(self.tas.MATCHING_DATA_LINES, msg, confidence = 0.8) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 self.tas.moveTo(PAPER_SCAN_POS)
@@ -640,7 +632,7 @@ class Run(ABC):
                 time.sleep(INSPECT_ALPHACHANGE_TIME)
                 self.tas.moveTo(PAPER_SCAN_POS)
 
-                if pg.locate(self.tas.MATCHING_DATA, msg) is None:
+                if locate(self.tas.MATCHING_DATA, msg) is None:
                     return True
             
             if self.tas.WANTED_CHECK and self.tas.date >= self.tas.DAY_14 and len(self.tas.wanted) != 0:
@@ -652,7 +644,7 @@ class Run(ABC):
                 time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
                 msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-                if pg.locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
+                if locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
                     self.tas.wanted.pop(0)
                     self.tas.click(INSPECT_BUTTON)
                     time.sleep(INSPECT_ALPHACHANGE_TIME)
@@ -670,7 +662,7 @@ class Run(ABC):
                 time.sleep(INSPECT_TIME)
                 msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-                if pg.locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
+                if locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
                     self.tas.wanted.pop(1)
                     self.tas.click(INSPECT_BUTTON)
                     time.sleep(INSPECT_ALPHACHANGE_TIME)
@@ -691,7 +683,7 @@ class Run(ABC):
                 time.sleep(INSPECT_ALPHACHANGE_TIME)
                 self.tas.moveTo(PAPER_SCAN_POS)
 
-                if pg.locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
+                if locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
                     self.tas.wanted.pop(2)
                     return True
             
@@ -793,7 +785,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
             
-            if pg.locate(self.tas.MATCHING_DATA, msg) is None:
+            if locate(self.tas.MATCHING_DATA, msg) is None:
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
                 return True
@@ -811,7 +803,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME - INSPECT_ALPHACHANGE_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
+            if locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
                 self.tas.wanted.pop(0)
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
@@ -829,7 +821,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
 
-            if pg.locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
+            if locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
                 self.tas.wanted.pop(1)
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
@@ -847,7 +839,7 @@ class Run(ABC):
             time.sleep(INSPECT_TIME)
             msg = bgFilter(before, np.asarray(self.tas.getScreen().crop(TABLE_AREA)))
             
-            if pg.locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
+            if locate(self.tas.NO_CORRELATION, msg, confidence = 0.6) is None:
                 self.tas.wanted.pop(2)
                 time.sleep(INSPECT_INTERROGATE_TIME - INSPECT_TIME)
                 self.tas.interrogate()
@@ -941,10 +933,7 @@ class Run(ABC):
                 self.tas.click(leftSlot(self.tas.getRulebook()["documents"]["work-pass"]["document-must-have-seal"]))
             else:
                 try:
-                    pos = Document.sealPos(
-                        np.asarray(doc.sealArea), WorkPass.BACKGROUNDS["seal-area"],
-                        WorkPass.BACKGROUNDS["seal-white"]
-                    )
+                    pos = doc.sealCheck.pos
                 except:
                     self.tas.click(onTable(rightSlot(centerOf(doc.getTableBox("seal-area")))))
                     self.tas.click(leftSlot(self.tas.getRulebook()["documents"]["work-pass"]["document-must-have-seal"]))
@@ -0,0 +1,165 @@
+from typing import NamedTuple
+from PIL    import Image
+import cv2, numpy as np
+
+class Box(NamedTuple):
+    left:   int
+    top:    int
+    width:  int
+    height: int
+
+def toMatchable(img: Image.Image | np.ndarray, grayscale: bool) -> np.ndarray:
+    """Converts an RGB image to what `cv2.matchTemplate` takes."""
+    if isinstance(img, Image.Image): img = np.asarray(img.convert("RGB"))
+
+    if grayscale: return cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    return np.ascontiguousarray(img)
+
+def packPixels(img: Image.Image | np.ndarray) -> np.ndarray:
+    """Packs each pixel into a single integer."""
+    if not isinstance(img, Image.Image): img = Image.fromarray(img)
+
+    # padding to 4 bytes lets numpy read pixels as integers directly
+    return np.asarray(img.convert("RGBX")).view(np.uint32)[..., 0]
+
+class _Powers:
+    # powers of a hash base and of its inverse, grown as needed.
+    # arithmetic is modulo 2^32 (numpy integers wrap around), where any odd base has an inverse
+
+    def __init__(self, base: int):
+        self.base = np.uint32(base)
+        self.inv  = np.uint32(pow(base, -1, 2 ** 32))
+        self.pows = np.ones(0, dtype = np.uint32)
+        self.invs = np.ones(0, dtype = np.uint32)
+
+    @staticmethod
+    def __series(base: np.uint32, n: int) -> np.ndarray:
+        series = np.full(n, base, dtype = np.uint32)
+        series[0] = 1
+        return np.cumprod(series, dtype = np.uint32)
+
+    def get(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        if len(self.pows) < n:
+            self.pows = _Powers.__series(self.base, n)
+            self.invs = _Powers.__series(self.inv,  n)
+
+        return self.pows[:n], self.invs[:n]
+
+_POWERS_X = _Powers(0x01000193)
+_POWERS_Y = _Powers(0x9E3779B1)
+
+def _windowHashes(values: np.ndarray, size: int, powers: _Powers) -> np.ndarray:
+    # hash of every window of the given size along the last axis, through prefix sums:
+    # the difference of two prefix sums is the window hash times base^start, which gets divided out
+    n = values.shape[-1]
+    pows, invs = powers.get(n)
+
+    sums = np.zeros(values.shape[:-1] + (n + 1,), dtype = np.uint32)
+    np.cumsum(values * pows, axis = -1, dtype = np.uint32, out = sums[..., 1:])
+    return (sums[..., size:] - sums[..., :-size]) * invs[:n - size + 1]
+
+def _rollingHashes(pixels: np.ndarray, w: int, h: int) -> np.ndarray:
+    # rows first, then columns of the row hashes
+    rows = _windowHashes(pixels, w, _POWERS_X)
+    return _windowHashes(rows.T, h, _POWERS_Y).T
+
+class Template:
+    """An image to look for on screen, converted once when it's loaded instead of on every search.
+
+    `region` is where the template is expected to appear, in window coordinates.
+    `confidence` and `grayscale` work like in pyautogui. A template with no confidence
+    is expected to appear pixel-identical, and is looked for with `locateExact`.
+    """
+
+    def __init__(
+        self, img: Image.Image | np.ndarray, *, region: tuple[int, int, int, int] | None = None,
+        confidence: float | None = None, grayscale: bool = True
+    ):
+        self.image      = img
+        self.region     = region
+        self.confidence = confidence
+        self.grayscale  = grayscale
+        self.needle     = toMatchable(img, grayscale)
+        self.pixels     = packPixels(img)
+        self.hash       = _rollingHashes(self.pixels, *self.size)[0, 0]
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.pixels.shape[1], self.pixels.shape[0]
+
+def _shift(box: Box | None, offset: tuple[int, int]) -> Box | None:
+    if box is None: return None
+    return box._replace(left = box.left + offset[0], top = box.top + offset[1])
+
+def locateAllExact(
+    needle: Template | Image.Image | np.ndarray, haystack: Image.Image | np.ndarray,
+    region: tuple[int, int, int, int] | None = None
+) -> list[Box]:
+    """Finds every pixel-identical occurrence of an image, with a 2D rolling hash.
+
+    Every position of the haystack is hashed in a single pass, then positions whose hash
+    matches the needle's get compared pixel by pixel, so collisions can't give wrong results.
+
+    Args:
+        needle: The image to look for. Templates have their hash computed already.
+        haystack: The image to look in, in RGB format.
+        region: The (left, top, right, bottom) of the area of the haystack to look in. None looks everywhere.
+
+    Returns:
+        The occurrences, top to bottom and left to right, in haystack coordinates.
+    """
+    if not isinstance(needle, Template): needle = Template(needle)
+
+    if region is not None:
+        if isinstance(haystack, Image.Image): haystack = haystack.crop(region)
+        else:                                 haystack = haystack[region[1]:region[3], region[0]:region[2]]
+
+    pixels = packPixels(haystack)
+
+    w, h = needle.size
+    if pixels.shape[0] < h or pixels.shape[1] < w: return []
+
+    offs  = (0, 0) if region is None else region[:2]
+    found = []
+    for y, x in zip(*np.nonzero(_rollingHashes(pixels, w, h) == needle.hash)):
+        if np.array_equal(pixels[y:y + h, x:x + w], needle.pixels):
+            found.append(Box(int(x) + offs[0], int(y) + offs[1], w, h))
+
+    return found
+
+def locateExact(
+    needle: Template | Image.Image | np.ndarray, haystack: Image.Image | np.ndarray,
+    region: tuple[int, int, int, int] | None = None
+) -> Box | None:
+    """Same as `locateAllExact`, but only returns the first occurrence, or None if there's none."""
+    found = locateAllExact(needle, haystack, region)
+    return found[0] if found else None
+
+def locate(
+    template: Template, img: Image.Image | np.ndarray, *,
+    confidence: float | None = None, offset: tuple[int, int] = (0, 0)
+) -> Box | None:
+    """Finds a template in a whole image.
+
+    Args:
+        template: The template to look for.
+        img: The image to look in, in RGB format.
+        confidence: Minimum match score. Defaults to the template's. If neither is given, the template has to match exactly.
+        offset: Added to the resulting position, for when `img` was cropped from something bigger.
+
+    Returns:
+        Where the template was found, or None if it wasn't.
+    """
+    if confidence is None: confidence = template.confidence
+    if confidence is None: return _shift(locateExact(template, img), offset)
+
+    haystack = toMatchable(img, template.grayscale)
+    w, h = template.size
+    if haystack.shape[0] < h or haystack.shape[1] < w: return None
+
+    result = cv2.matchTemplate(haystack, template.needle, cv2.TM_CCOEFF_NORMED)
+    np.nan_to_num(result, copy = False) # flat areas give nan
+
+    _, best, _, (x, y) = cv2.minMaxLoc(result)
+    if best <= confidence: return None
+    return Box(x + offset[0], y + offset[1], w, h)
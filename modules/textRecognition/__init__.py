@@ -3,8 +3,67 @@ import logging
 logger = logging.getLogger('tas.' + __name__)
 
 try:
-    from modules.textRecognition.textRecognition import *
-    logger.info("using Cython compiled text recognition")
+    from modules.textRecognition.textRecognitionNogil import *
+    logger.info("using Cython compiled text recognition (nogil)")
 except ImportError:
-    from modules.textRecognition.source.textRecognition import *
-    logger.info("using Python text recognition")
\ No newline at end of file
+    try:
+        from modules.textRecognition.textRecognition import *
+        logger.info("using Cython compiled text recognition")
+    except ImportError:
+        from modules.textRecognition.source.textRecognition import *
+        logger.info("using Python text recognition")
+
+import numpy as np
+
+from modules.textRecognition.cache        import OCRCache
+from modules.textRecognition.phraseTrie   import PhraseTrie, TrieNode
+from modules.textRecognition.glyphMatcher import MATCHER_MAX_HEIGHT
+
+# the compiled versions don't export it
+from modules.textRecognition.source.textRecognition import _04b03Fix
+
+OCR_CACHE = OCRCache()
+
+_parseText = parseText
+_parseDate = parseDate
+
+# the same field content gets read many times (same name on different documents, transcription updates...),
+# so results are cached by pixel content. arrays are converted here once and passed down as they are
+def parseText(
+    img, bg, font, textColor, chars, *,
+    endAt = None, misalignFix = False, checkFn = charCheck, lenFn = getCharLength
+):
+    img = np.asarray(img)
+    if bg is not None: bg = np.asarray(bg)
+
+    return OCR_CACHE.get(
+        OCRCache.key(img, bg, font, "text", textColor, chars, endAt, misalignFix, checkFn.__name__, lenFn.__name__),
+        _parseText, img, bg, font, textColor, chars,
+        endAt = endAt, misalignFix = misalignFix, checkFn = checkFn, lenFn = lenFn
+    )
+
+def parseDate(img, bg, font, textColor, *, endAt = None):
+    img = np.asarray(img)
+    if bg is not None: bg = np.asarray(bg)
+
+    return OCR_CACHE.get(
+        OCRCache.key(img, bg, font, "date", textColor, endAt),
+        _parseDate, img, bg, font, textColor, endAt = endAt
+    )
+
+# reads text that's expected to be one of the phrases in a trie. if it turns out not to be one, the rest is
+# read as usual in the same pass, so PhraseTrie.walk tells the two apart. returns None if the glyph matcher
+# can't be used, so the caller can fall back to parseText.
+# not cached, since results depend on where in the trie reading starts
+def parseGuided(img, bg, font, textColor, chars, node, *, endAt = None):
+    img = np.asarray(img)
+    bg  = np.asarray(bg)
+
+    if font not in STATIC_OBJ.MATCHERS or img.shape[0] > MATCHER_MAX_HEIGHT: return None
+    if np.array_equal(img, bg): return ""
+
+    result = STATIC_OBJ.MATCHERS[font].parse(img, bg, textColor, chars, 0, False, endAt, node).strip()
+
+    # same fix parseText does, phrases already get it right
+    if font is STATIC_OBJ._04B03 and PhraseTrie.walk(node, result) is None: return _04b03Fix(result)
+    return result
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from threading   import Lock
+from typing      import Any, Callable
+from PIL         import ImageFont
+import os, pickle, hashlib, numpy as np
+
+import logging
+
+logger = logging.getLogger('tas.' + __name__)
+
+# bump this whenever recognition changes in a way that invalidates old results
+OCR_CACHE_VERSION = 1
+
+class OCRCache:
+    """Least recently used cache of text recognition results.
+
+    Entries are keyed by a hash of the field pixels and of everything else that affects the result,
+    so the same content on different documents or in different frames is only recognized once.
+    """
+
+    def __init__(self, size: int = 4096):
+        self.size   = size
+        self.hits   = 0
+        self.misses = 0
+
+        self.__data: OrderedDict[bytes, Any] = OrderedDict()
+        self.__lock = Lock()
+
+    @staticmethod
+    def __fontKey(font: Any) -> Any:
+        # fonts have to be identified by something that stays the same between runs
+        if isinstance(font, ImageFont.FreeTypeFont):
+            return os.path.basename(font.path), font.size
+
+        return None # digits, the check function tells them apart
+
+    @staticmethod
+    def key(img: np.ndarray, bg: np.ndarray | None, font: Any, *params) -> bytes:
+        hash_ = hashlib.blake2b(digest_size = 16)
+
+        for arr in (img, bg):
+            if arr is None:
+                hash_.update(b"\0")
+                continue
+
+            hash_.update(repr(arr.shape).encode())
+            hash_.update(np.ascontiguousarray(arr).data)
+
+        hash_.update(repr((OCRCache.__fontKey(font),) + params).encode())
+        return hash_.digest()
+
+    def get(self, key: bytes, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Returns the cached result for `key`, or computes it with `fn(*args, **kwargs)` and stores it."""
+
+        with self.__lock:
+            if key in self.__data:
+                self.hits += 1
+                self.__data.move_to_end(key)
+                return self.__data[key]
+
+            self.misses += 1
+
+        # the lock is not held while recognizing, so other threads can use the cache meanwhile
+        result = fn(*args, **kwargs)
+
+        with self.__lock:
+            self.__data[key] = result
+            self.__data.move_to_end(key)
+            self.__trim()
+
+        return result
+
+    def __trim(self) -> None:
+        while len(self.__data) > self.size:
+            self.__data.popitem(last = False)
+
+    def resize(self, size: int) -> None:
+        with self.__lock:
+            self.size = size
+            self.__trim()
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__data.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def stats(self) -> str:
+        with self.__lock:
+            total = self.hits + self.misses
+            rate  = 0 if total == 0 else self.hits / total * 100
+            return f"OCR cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {len(self.__data)}/{self.size} entries"
+
+    def load(self, file: str) -> None:
+        if not os.path.exists(file): return
+
+        try:
+            with open(file, "rb") as f:
+                version, entries = pickle.load(f)
+        except Exception as e:
+            logger.warning(f'Unable to read OCR cache "{file}": {e}')
+            return
+
+        if version != OCR_CACHE_VERSION:
+            logger.info(f'Ignoring outdated OCR cache "{file}"')
+            return
+
+        with self.__lock:
+            self.__data.update(entries)
+            self.__trim()
+
+        logger.info(f"Loaded {len(entries)} OCR cache entries")
+
+    def save(self, file: str) -> None:
+        with self.__lock:
+            entries = list(self.__data.items())
+
+        try:
+            with open(file, "wb") as f:
+                pickle.dump((OCR_CACHE_VERSION, entries), f)
+        except Exception as e:
+            logger.warning(f'Unable to write OCR cache "{file}": {e}')
@@ -0,0 +1,57 @@
+from PIL    import Image, ImageDraw, ImageFont
+from typing import Callable
+import numpy as np
+
+# has to be taller than any text field we read, rows below the glyph are just empty
+GLYPH_CANVAS_HEIGHT = 64
+GLYPH_CANVAS_MARGIN = 16
+
+class Glyph:
+    def __init__(self, mask: np.ndarray, length: int, spaceLength: int):
+        self.mask        = mask        # (GLYPH_CANVAS_HEIGHT, length + 2), True where the character has ink
+        self.length      = length      # length used for bound checks
+        self.spaceLength = spaceLength # how much to advance after the character is found
+
+class GlyphAtlas:
+    """Binary masks of every character of a font, rendered once so text recognition never has to draw anything.
+
+    Masks are aligned to the comparison window used by the text recognition system: column 0 of a mask
+    is the column where the character is checked, and row 0 is the top of the text field, so the font's
+    y offset is already applied.
+    """
+
+    def __init__(
+        self, font: ImageFont.FreeTypeFont, y: int,
+        lenFn: Callable[[ImageFont.FreeTypeFont, str, bool], int],
+        fixes: dict[str, Callable[[np.ndarray], None]] | None = None
+    ):
+        self.font = font
+        self.y    = y
+        self.glyphs: dict[str, Glyph] = {}
+
+        self.__lenFn = lenFn
+        self.__fixes = {} if fixes is None else fixes
+
+    def render(self, c: str) -> Glyph:
+        length = self.__lenFn(self.font, c, False)
+
+        canvas = Image.new("L", (int(self.font.getlength(c)) + GLYPH_CANVAS_MARGIN, GLYPH_CANVAS_HEIGHT), 0)
+        draw = ImageDraw.Draw(canvas)
+        draw.fontmode = "1" # disable antialiasing
+        draw.text((-1, self.y), c, 255, self.font)
+
+        mask = np.asarray(canvas) != 0
+        if c in self.__fixes: self.__fixes[c](mask)
+
+        glyph = Glyph(np.ascontiguousarray(mask[:, :length + 2]), length, self.__lenFn(self.font, c, True))
+        self.glyphs[c] = glyph
+        return glyph
+
+    def load(self, chars: str) -> None:
+        for c in chars:
+            if c not in self.glyphs:
+                self.render(c)
+
+    def get(self, c: str) -> Glyph:
+        if c in self.glyphs: return self.glyphs[c]
+        return self.render(c) # in case someone asks for a character that wasn't prerendered
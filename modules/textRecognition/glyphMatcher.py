@@ -0,0 +1,181 @@
+import numpy as np
+
+from modules.constants.other            import TEXT_RECOGNITION_TOLERANCE
+from modules.textRecognition.glyphAtlas import GlyphAtlas
+from modules.textRecognition.phraseTrie import TrieNode
+
+# every column of a field is packed into an integer: one bit for each row that can't be text
+# and one for each row that can't be background. small fields fit more columns in a single word
+MATCHER_WORD_BITS  = 64
+MATCHER_MAX_HEIGHT = MATCHER_WORD_BITS // 2
+
+class GlyphTable:
+    """Glyphs of a charset packed into words, ready to be compared against a packed field."""
+
+    def __init__(self, atlas: GlyphAtlas, chars: str, h: int):
+        self.chars = chars
+
+        # rows are padded, so that a whole number of columns fits in a word
+        self.colBits     = 2 * (8 if h <= 8 else (16 if h <= 16 else MATCHER_MAX_HEIGHT))
+        self.colsPerWord = MATCHER_WORD_BITS // self.colBits
+
+        glyphs = [atlas.get(c) for c in chars]
+        self.lengths      = np.array([g.length      for g in glyphs], dtype = np.int64)
+        self.spaceLengths = np.array([g.spaceLength for g in glyphs], dtype = np.int64)
+        self.isSpace      = np.array([c == " "      for c in chars])
+
+        # columns past the end of a glyph are "don't care", so they stay zero
+        width = max(max(g.length + 2 for g in glyphs), 1)
+        self.words   = -(-width // self.colsPerWord)
+        self.width   = self.words * self.colsPerWord
+        self.offsets = np.arange(self.words) * self.colsPerWord
+
+        cols = np.zeros((len(glyphs), self.width), dtype = np.uint64)
+        for i, g in enumerate(glyphs):
+            ink = g.mask[:h, :max(g.length + 2, 0)]
+            cols[i, :ink.shape[1]] = GlyphTable.packColumns(ink, ~ink, self.colBits)
+
+        self.masks = GlyphTable.packWords(cols, self.colsPerWord, self.colBits)[:, ::self.colsPerWord]
+
+    @staticmethod
+    def packColumns(notText: np.ndarray, notBg: np.ndarray, colBits: int) -> np.ndarray:
+        rows = np.arange(notText.shape[0], dtype = np.uint64)[:, np.newaxis]
+        return (
+            (notText * np.left_shift(np.uint64(1), rows)).sum(axis = 0, dtype = np.uint64) |
+            (notBg   * np.left_shift(np.uint64(1), rows + np.uint64(colBits // 2))).sum(axis = 0, dtype = np.uint64)
+        )
+
+    @staticmethod
+    def packWords(cols: np.ndarray, colsPerWord: int, colBits: int) -> np.ndarray:
+        # word i holds columns i, i + 1, ..., i + colsPerWord - 1
+        n = cols.shape[-1] - colsPerWord + 1
+        words = cols[..., :n].copy()
+        for k in range(1, colsPerWord):
+            words |= cols[..., k:k + n] << np.uint64(k * colBits)
+
+        return words
+
+class GlyphMatcher:
+    """Matches every glyph of a charset at every column of a field in one go, then walks the matches.
+
+    Gives the same results as scanning the field with `charCheck`, one character and one pixel at a time.
+    """
+
+    def __init__(self, atlas: GlyphAtlas):
+        self.atlas = atlas
+        self.__tables: dict[tuple[str, int], GlyphTable] = {}
+        self.__refs:   dict[tuple[tuple[int, int, int], int, int], np.ndarray] = {}
+
+    def getTable(self, chars: str, h: int) -> GlyphTable:
+        key = (chars, h)
+        if key not in self.__tables:
+            self.__tables[key] = GlyphTable(self.atlas, chars, h)
+
+        return self.__tables[key]
+
+    def __getColorRef(self, textColor: tuple[int, int, int], h: int, w: int) -> np.ndarray:
+        # broadcasting a single color is slow, so a solid image of it is kept around.
+        # it's never written to after creation, since fields can be parsed from multiple threads
+        key = (tuple(textColor), h, w)
+        if key not in self.__refs:
+            ref = np.empty((h, w, 3), dtype = np.uint8)
+            ref[:] = textColor
+            self.__refs[key] = ref
+
+        return self.__refs[key]
+
+    @staticmethod
+    def __mismatch(img: np.ndarray, ref: np.ndarray) -> np.ndarray:
+        # same tolerance rule as arrayEQWithTol: differences are fine if they wrap into [-tol - 1, tol]
+        diff = img - ref
+        diff += TEXT_RECOGNITION_TOLERANCE + 1
+        bad = diff > 2 * TEXT_RECOGNITION_TOLERANCE + 1
+        return bad[..., 0] | bad[..., 1] | bad[..., 2]
+
+    def __pack(self, table: GlyphTable, img: np.ndarray, bg: np.ndarray, textColor: tuple[int, int, int]) -> np.ndarray:
+        h, w = img.shape[:2]
+
+        # glyphs that go past the right edge only get compared on the pixels that exist
+        cols = np.zeros(w + table.width, dtype = np.uint64)
+        cols[:w] = GlyphTable.packColumns(
+            self.__mismatch(img, self.__getColorRef(textColor, h, w)),
+            self.__mismatch(img, bg), table.colBits
+        )
+        return GlyphTable.packWords(cols, table.colsPerWord, table.colBits)
+
+    def matches(self, table: GlyphTable, img: np.ndarray, bg: np.ndarray, textColor: tuple[int, int, int]) -> np.ndarray:
+        """Returns a (glyphs, columns) boolean matrix telling where each glyph can be found."""
+
+        w = img.shape[1]
+        words = self.__pack(table, img, bg, textColor)
+
+        # the first word alone already rules out most positions, so the rest only gets checked where needed
+        found = (table.masks[:, :1] & words[np.newaxis, :w]) == 0
+        g, x  = np.nonzero(found)
+        wrong = (table.masks[g, 1:] & words[x[:, np.newaxis] + table.offsets[np.newaxis, 1:]]).any(axis = 1)
+        found[g[wrong], x[wrong]] = False
+        return found
+
+    @staticmethod
+    def __firstEvents(table: GlyphTable, found: np.ndarray, w: int, skipSpace: bool) -> tuple[np.ndarray, np.ndarray]:
+        # for each column, the first character (in charset order) that either matches or would go out of bounds
+        cond = found | (np.arange(w)[np.newaxis, :] + table.lengths[:, np.newaxis] >= w)
+        if skipSpace: cond[table.isSpace] = False
+
+        return np.argmax(cond, axis = 0), cond.any(axis = 0)
+
+    def parse(
+        self, img: np.ndarray, bg: np.ndarray, textColor: tuple[int, int, int],
+        chars: str, x: int, begin: bool, endAt: str | None, node: TrieNode | None = None
+    ) -> str:
+        """Walks the matches of the field from `x`.
+
+        If `node` is given, reading follows the phrases of its trie: where more than one character matches,
+        the one that continues a phrase gets picked (so "O" and "0" don't get mixed up). Once the text can't
+        be a phrase, the rest is read as usual from the same matches.
+        """
+        w = img.shape[1]
+        table = self.getTable(chars, img.shape[0])
+        found = self.matches(table, img, bg, textColor)
+
+        first, anyFirst = self.__firstEvents(table, found, w, False)
+        if begin: beginFirst, beginAny = self.__firstEvents(table, found, w, True)
+
+        result  = ""
+        spacing = False # after spaces that don't continue a phrase, nothing else can come
+        while x < w:
+            if begin: g, ok = beginFirst[x], beginAny[x]
+            else:     g, ok = first[x],      anyFirst[x]
+
+            if   not ok:                    x += 1
+            elif x + table.lengths[g] >= w: x += int(table.lengths[g]) + 1 # out of bounds
+            else:
+                if node is not None:
+                    h = g
+                    if table.chars[g] not in node.children:
+                        # another character matching here might continue a phrase instead.
+                        # the scan stops at the first character that would go out of bounds, so that's the last candidate
+                        outOfBounds = np.flatnonzero(x + table.lengths[g:] >= w)
+                        last = g + (outOfBounds[0] if len(outOfBounds) != 0 else len(table.chars) - g)
+
+                        for h in g + 1 + np.flatnonzero(found[g + 1:last, x]):
+                            if table.chars[h] in node.children: break
+                        else: h = g
+
+                    c = table.chars[h]
+                    if c in node.children and not spacing:
+                        node = node.children[c]
+                    elif c == " ":
+                        # spaces before and after the text are fine
+                        spacing = result.strip() != ""
+                    else: node, h = None, g # not a phrase, the rest is read as usual
+
+                    g = h
+
+                begin   = False
+                result += table.chars[g]
+                x      += int(table.spaceLengths[g])
+
+                if endAt is not None and result.endswith(endAt): break
+
+        return result
@@ -0,0 +1,44 @@
+from typing import Iterable
+
+class TrieNode:
+    def __init__(self):
+        self.children: dict[str, TrieNode] = {}
+        self.count = 0 # phrases that start with the text leading here
+
+        # the phrase, once there's only one left
+        self.phrase: str | None = None
+
+class PhraseTrie:
+    """Every known phrase of a conversation, sorted by prefix.
+
+    Used to guide text recognition: only characters that continue a phrase get picked,
+    and reading can stop once the text so far can only be one phrase.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.root = TrieNode()
+
+        for phrase in set(phrases):
+            self.add(phrase)
+
+    def add(self, phrase: str) -> None:
+        node = self.root
+        PhraseTrie.__count(node, phrase)
+
+        for c in phrase:
+            node = node.children.setdefault(c, TrieNode())
+            PhraseTrie.__count(node, phrase)
+
+    @staticmethod
+    def __count(node: TrieNode, phrase: str) -> None:
+        node.count += 1
+        node.phrase = phrase if node.count == 1 else None
+
+    @staticmethod
+    def walk(node: TrieNode, text: str) -> TrieNode | None:
+        """Follows `text` from `node`. Returns None if no phrase continues that way."""
+        for c in text:
+            node = node.children.get(c)
+            if node is None: return None
+
+        return node
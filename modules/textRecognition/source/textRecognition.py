@@ -1,12 +1,17 @@
-from PIL      import Image, ImageDraw, ImageFont
+from PIL      import Image, ImageFont
 from datetime import date
+from typing   import Iterable
 import numpy as np
 
-from modules.utils            import arrayEQWithTol
-from modules.constants.other  import DATE_CHARS, TEXT_RECOGNITION_TOLERANCE
-from modules.constants.screen import DIGITS_LENGTH, DIGITS_HEIGHT
+from modules.utils                        import arrayEQWithTol, cropArray
+from modules.constants.other              import DATE_CHARS, TEXT_RECOGNITION_TOLERANCE
+from modules.constants.screen             import DIGITS_LENGTH, DIGITS_HEIGHT
+from modules.textRecognition.glyphAtlas   import GlyphAtlas
+from modules.textRecognition.glyphMatcher import GlyphMatcher, MATCHER_MAX_HEIGHT
 
 def STATIC_OBJ(): ...
+STATIC_OBJ.ATLASES  = {}
+STATIC_OBJ.MATCHERS = {}
 
 def getCharLength(font: ImageFont.FreeTypeFont, c: str, space: bool = False) -> int:
     # i've never worked with truetype, but wtf?
@@ -16,59 +21,63 @@ def getCharLength(font: ImageFont.FreeTypeFont, c: str, space: bool = False) ->
     
     return int(font.getlength(c)) - (1 if space else 3)
 
+def getYOffset(font: ImageFont.FreeTypeFont) -> int:
+    # again... truetype, wtf?
+    if   font is STATIC_OBJ.MINI_KYLIE: return -8
+    elif font is STATIC_OBJ._04B03:     return -2
+    else:                               return 0
+
+# workarounds for slightly wrong fonts
+def _bmMini6Fix(mask: np.ndarray) -> None:
+    mask[2:4, 6:8] = False # covers wrong pixels
+
+def _bmMini9Fix(mask: np.ndarray) -> None:
+    mask[8:10, 0:2] = False
+
+def _04b03AFix(mask: np.ndarray) -> None:
+    mask[6:8, 2:6] = False # cover wrong pixels
+    mask[4:6, 2:6] = True  # replace bg with correct pixels
+
+def loadGlyphAtlases(fonts: Iterable[ImageFont.FreeTypeFont], chars: str) -> None:
+    for font in fonts:
+        if   font is STATIC_OBJ.BM_MINI: fixes = {"6": _bmMini6Fix, "9": _bmMini9Fix}
+        elif font is STATIC_OBJ._04B03:  fixes = {"A": _04b03AFix}
+        else:                            fixes = None
+
+        atlas = GlyphAtlas(font, getYOffset(font), getCharLength, fixes)
+        atlas.load(chars)
+        STATIC_OBJ.ATLASES[font]  = atlas
+        STATIC_OBJ.MATCHERS[font] = GlyphMatcher(atlas)
+
 def charCheck(
-    img: Image.Image, bg: Image.Image, font: ImageFont.FreeTypeFont, 
+    img: np.ndarray, bg: np.ndarray, font: ImageFont.FreeTypeFont, 
     textColor: tuple[int, int, int], c: str, x: int, y: int, l: int
 ) -> bool:  
-    # draw character on right position in background
-    testImg = bg.copy()
-    draw = ImageDraw.Draw(testImg, mode = "RGB")
-    draw.fontmode = "1" # disable antialiasing
-
-    draw.text((x - 1, y), c, textColor, font)
-
-    # workaround for slightly wrong fonts
-    if font is STATIC_OBJ.BM_MINI:
-        # covers wrong pixels
-        if c == "6":
-            corrBox = (x + 6, 2, x + 8, 4)
-            testImg.paste(bg.crop(corrBox), corrBox[:2])
-        elif c == "9":
-            corrBox = (x, 8, x + 2, 10)
-            testImg.paste(bg.crop(corrBox), corrBox[:2])
-    elif font is STATIC_OBJ._04B03:
-        if c == "A":
-            corrBox = (x + 2, 6, x + 6, 8)
-            corrBg = bg.crop(corrBox)
-            corrFg = corrBg.copy()
-            corrFg.paste(textColor, (0, 0) + corrFg.size)
-            testImg.paste(corrBg, corrBox[:2]) # cover wrong pixels
-            testImg.paste(corrFg, (x + 2, 4))  # replace bg with correct pixels
-
-    box = (x, 0, l + x + 2, img.size[1])
-    return arrayEQWithTol(np.asarray(img.crop(box)), np.asarray(testImg.crop(box)), TEXT_RECOGNITION_TOLERANCE)
+    # put the prerendered character on the right position in background
+    test = bg[:, x:l + x + 2].copy()
+    test[STATIC_OBJ.ATLASES[font].get(c).mask[:test.shape[0], :test.shape[1]]] = textColor
+    return arrayEQWithTol(img[:, x:l + x + 2], test, TEXT_RECOGNITION_TOLERANCE)
 
 def digitLength(_, _a, space) -> int:
     return DIGITS_LENGTH - (0 if space else 2)
 
 def digitCheck(
-    img: Image.Image, _, font: dict[str, np.ndarray], 
+    img: np.ndarray, _, font: dict[str, np.ndarray], 
     _a, c: str, x: int, _b, _c
 ) -> bool:
-    return np.array_equal(np.asarray(img.crop((x, 0, x + DIGITS_LENGTH, DIGITS_HEIGHT))), font[c])
+    return np.array_equal(cropArray(img, (x, 0, x + DIGITS_LENGTH, DIGITS_HEIGHT)), font[c])
 
-def getAlign(img: Image.Image, bg: Image.Image) -> int:
+def getAlign(img: np.ndarray, bg: np.ndarray) -> int:
     # this function performs a binarysearch-like algorithm to find the start of text
 
     a = 0
-    b = img.size[0]
+    b = img.shape[1]
 
     while a < b:
         m = a + (b - a) // 2
         if a == m: break
 
-        box = (a, 0, m, img.size[1])
-        if np.array_equal(np.asarray(img.crop(box)), np.asarray(bg.crop(box))):
+        if np.array_equal(img[:, a:m], bg[:, a:m]):
               a = m
         else: b = m - 1
 
@@ -95,40 +104,49 @@ def parseText(
     textColor: tuple[int, int, int], chars: str, *, 
     endAt = None, misalignFix = False, checkFn = charCheck, lenFn = getCharLength
 ):
-    if np.array_equal(np.asarray(img), np.asarray(bg)): return "" # if fg == bg there's no text
+    # convert once, every check works on arrays
+    img = np.asarray(img)
+    if bg is not None: bg = np.asarray(bg)
 
-    # again... truetype, wtf?
-    if   font is STATIC_OBJ.MINI_KYLIE: y = -8
-    elif font is STATIC_OBJ._04B03:     y = -2
-    else:                               y = 0
+    if np.array_equal(img, bg): return "" # if fg == bg there's no text
+
+    y = getYOffset(font)
     
     if misalignFix: x = max(getAlign(img, bg) - 10, 0) # helps with characters that have blank spaces at beginning
     else:           x = 0
     
     result = ""
     begin = misalignFix
-    while x < img.size[0]:
-        added = None
-        for c in chars:
-            if begin and c == " ": continue
-
-            # avoids out of bound accesses that read wrong image data
-            l = lenFn(font, c, False)
-            if x + l >= img.size[0]: 
-                x += l
-                break
+
+    # the whole charset gets matched at once when possible, the scan gives the same results
+    if (
+        checkFn is charCheck and lenFn is getCharLength and 
+        font in STATIC_OBJ.MATCHERS and img.shape[0] <= MATCHER_MAX_HEIGHT
+    ):
+        result = STATIC_OBJ.MATCHERS[font].parse(img, bg, textColor, chars, x, begin, endAt)
+    else:
+        while x < img.shape[1]:
+            added = None
+            for c in chars:
+                if begin and c == " ": continue
+
+                # avoids out of bound accesses that read wrong image data
+                l = lenFn(font, c, False)
+                if x + l >= img.shape[1]: 
+                    x += l
+                    break
             
-            if checkFn(img, bg, font, textColor, c, x, y, l):
-                added = c
-                break
+                if checkFn(img, bg, font, textColor, c, x, y, l):
+                    added = c
+                    break
 
-        if added is None: x += 1
-        else:
-            begin   = False
-            result += added         
-            x      += lenFn(font, added, True)
+            if added is None: x += 1
+            else:
+                begin   = False
+                result += added         
+                x      += lenFn(font, added, True)
 
-        if endAt is not None and result.endswith(endAt): break
+            if endAt is not None and result.endswith(endAt): break
 
     if font is STATIC_OBJ._04B03: return _04b03Fix(result.strip())
     return result.strip()
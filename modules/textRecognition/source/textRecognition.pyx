@@ -1,17 +1,21 @@
-from PIL      import Image, ImageDraw, ImageFont
+from PIL      import Image, ImageFont
 from datetime import date
 import numpy as np
 cimport cython
 
-from modules.utils            import arrayEQWithTol
-from modules.constants.other  import DATE_CHARS, TEXT_RECOGNITION_TOLERANCE
-from modules.constants.screen import DIGITS_LENGTH, DIGITS_HEIGHT
+from modules.utils                        import arrayEQWithTol, cropArray
+from modules.constants.other              import DATE_CHARS, TEXT_RECOGNITION_TOLERANCE
+from modules.constants.screen             import DIGITS_LENGTH, DIGITS_HEIGHT
+from modules.textRecognition.glyphAtlas   import GlyphAtlas
+from modules.textRecognition.glyphMatcher import GlyphMatcher, MATCHER_MAX_HEIGHT
 
 class _Fonts:
     def __init__(self):
         self.MINI_KYLIE = None
         self.BM_MINI    = None
         self._04B03     = None
+        self.ATLASES    = {}
+        self.MATCHERS   = {}
 
 STATIC_OBJ = _Fonts()
 
@@ -23,38 +27,44 @@ cpdef int getCharLength(object font, str c, bint space):
     
     return int(font.getlength(c)) - (1 if space else 3)
 
+cpdef int getYOffset(object font):
+    # again... truetype, wtf?
+    if   font is STATIC_OBJ.MINI_KYLIE: return -8
+    elif font is STATIC_OBJ._04B03:     return -2
+    else:                               return 0
+
+# workarounds for slightly wrong fonts
+def _bmMini6Fix(object mask):
+    mask[2:4, 6:8] = False # covers wrong pixels
+
+def _bmMini9Fix(object mask):
+    mask[8:10, 0:2] = False
+
+def _04b03AFix(object mask):
+    mask[6:8, 2:6] = False # cover wrong pixels
+    mask[4:6, 2:6] = True  # replace bg with correct pixels
+
+cpdef void loadGlyphAtlases(object fonts, str chars):
+    cdef dict fixes
+    for font in fonts:
+        if   font is STATIC_OBJ.BM_MINI: fixes = {"6": _bmMini6Fix, "9": _bmMini9Fix}
+        elif font is STATIC_OBJ._04B03:  fixes = {"A": _04b03AFix}
+        else:                            fixes = None
+
+        atlas = GlyphAtlas(font, getYOffset(font), getCharLength, fixes)
+        atlas.load(chars)
+        STATIC_OBJ.ATLASES[font]  = atlas
+        STATIC_OBJ.MATCHERS[font] = GlyphMatcher(atlas)
+
 @cython.boundscheck(False)
 cpdef bint charCheck(
     object img, object bg, object font, 
     tuple textColor, str c, int x, int y, int l
 ):  
-    # draw character on right position in background
-    testImg = bg.copy()
-    draw = ImageDraw.Draw(testImg, mode = "RGB")
-    draw.fontmode = "1" # disable antialiasing
-
-    draw.text((x - 1, y), c, textColor, font)
-
-    # workaround for slightly wrong fonts
-    if font is STATIC_OBJ.BM_MINI:
-        # covers wrong pixels
-        if c == "6":
-            corrBox = (x + 6, 2, x + 8, 4)
-            testImg.paste(bg.crop(corrBox), corrBox[:2])
-        elif c == "9":
-            corrBox = (x, 8, x + 2, 10)
-            testImg.paste(bg.crop(corrBox), corrBox[:2])
-    elif font is STATIC_OBJ._04B03:
-        if c == "A":
-            corrBox = (x + 2, 6, x + 6, 8)
-            corrBg = bg.crop(corrBox)
-            corrFg = corrBg.copy()
-            corrFg.paste(textColor, (0, 0) + corrFg.size)
-            testImg.paste(corrBg, corrBox[:2]) # cover wrong pixels
-            testImg.paste(corrFg, (x + 2, 4))  # replace bg with correct pixels
-
-    box = (x, 0, l + x + 2, img.size[1])
-    return arrayEQWithTol(np.asarray(img.crop(box)), np.asarray(testImg.crop(box)), TEXT_RECOGNITION_TOLERANCE)
+    # put the prerendered character on the right position in background
+    test = bg[:, x:l + x + 2].copy()
+    test[STATIC_OBJ.ATLASES[font].get(c).mask[:test.shape[0], :test.shape[1]]] = textColor
+    return arrayEQWithTol(img[:, x:l + x + 2], test, TEXT_RECOGNITION_TOLERANCE)
 
 cpdef int digitLength(object _, object _a, bint space):
     return DIGITS_LENGTH - (0 if space else 2)
@@ -63,7 +73,7 @@ cpdef bint digitCheck(
     object img, object _, dict font, 
     tuple _a, str c, int x, int _b, int _c
 ):
-    return np.array_equal(np.asarray(img.crop((x, 0, x + DIGITS_LENGTH, DIGITS_HEIGHT))), font[c])
+    return np.array_equal(cropArray(img, (x, 0, x + DIGITS_LENGTH, DIGITS_HEIGHT)), font[c])
 
 @cython.cdivision(True)
 @cython.boundscheck(False)
@@ -71,15 +81,14 @@ cdef int getAlign(object img, object bg):
     # this function performs a binarysearch-like algorithm to find the start of text
 
     cdef int a = 0
-    cdef int b = img.size[0]
+    cdef int b = img.shape[1]
     cdef int m
 
     while a < b:
         m = a + (b - a) // 2
         if a == m: break
 
-        box = (a, 0, m, img.size[1])
-        if np.array_equal(np.asarray(img.crop(box)), np.asarray(bg.crop(box))):
+        if np.array_equal(img[:, a:m], bg[:, a:m]):
               a = m
         else: b = m - 1
 
@@ -106,13 +115,13 @@ cpdef inline str parseText(
     tuple textColor, str chars, 
     object endAt = None, bint misalignFix = False, object checkFn = charCheck, object lenFn = getCharLength
 ):
-    if np.array_equal(np.asarray(img), np.asarray(bg)): return "" # if fg == bg there's no text
+    # convert once, every check works on arrays
+    img = np.asarray(img)
+    if bg is not None: bg = np.asarray(bg)
+
+    if np.array_equal(img, bg): return "" # if fg == bg there's no text
     
-    # again... truetype, wtf?
-    cdef int y
-    if   font is STATIC_OBJ.MINI_KYLIE: y = -8
-    elif font is STATIC_OBJ._04B03:     y = -2
-    else:                               y = 0
+    cdef int y = getYOffset(font)
     
     cdef int x, l
     if misalignFix: x = max(getAlign(img, bg) - 10, 0) # helps with characters that have blank spaces at beginning
@@ -121,28 +130,37 @@ cpdef inline str parseText(
     cdef str  result = ""
     cdef str  c
     cdef bint begin = misalignFix
-    while x < img.size[0]:
-        added = None
-        for c in chars:
-            if begin and c == " ": continue
-
-            # avoids out of bound accesses that read wrong image data
-            l = lenFn(font, c, False)
-            if x + l >= img.size[0]: 
-                x += l
-                break
+    cdef int width = img.shape[1]
+
+    # the whole charset gets matched at once when possible, the scan gives the same results
+    if (
+        checkFn is charCheck and lenFn is getCharLength and 
+        font in STATIC_OBJ.MATCHERS and img.shape[0] <= MATCHER_MAX_HEIGHT
+    ):
+        result = STATIC_OBJ.MATCHERS[font].parse(img, bg, textColor, chars, x, begin, endAt)
+    else:
+        while x < width:
+            added = None
+            for c in chars:
+                if begin and c == " ": continue
+
+                # avoids out of bound accesses that read wrong image data
+                l = lenFn(font, c, False)
+                if x + l >= width: 
+                    x += l
+                    break
             
-            if checkFn(img, bg, font, textColor, c, x, y, l):
-                added = c
-                break
+                if checkFn(img, bg, font, textColor, c, x, y, l):
+                    added = c
+                    break
 
-        if added is None: x += 1
-        else:
-            begin   = False
-            result += added         
-            x      += lenFn(font, added, True)
+            if added is None: x += 1
+            else:
+                begin   = False
+                result += added         
+                x      += lenFn(font, added, True)
 
-        if endAt is not None and result.endswith(endAt): break
+            if endAt is not None and result.endswith(endAt): break
 
     if font is STATIC_OBJ._04B03: return _04b03Fix(result.strip())
     return result.strip()
@@ -0,0 +1,199 @@
+from datetime import date
+import numpy as np
+cimport cython
+
+from libc.stdint cimport uint8_t, int32_t, int64_t
+
+from modules.constants.other import DATE_CHARS, TEXT_RECOGNITION_TOLERANCE
+from modules.textRecognition.source.textRecognition import (
+    STATIC_OBJ, getCharLength, getYOffset, loadGlyphAtlases, charCheck,
+    digitLength, digitCheck, _04b03Fix, parseText as _pyParseText
+)
+
+# glyphs of a charset in a layout the scan loop can read without the GIL
+class _GlyphTable:
+    def __init__(self, atlas, str chars):
+        glyphs = [atlas.get(c) for c in chars]
+        width  = max(max(g.length + 2 for g in glyphs), 1)
+        height = glyphs[0].mask.shape[0]
+
+        self.masks = np.zeros((len(glyphs), height, width), dtype = np.uint8)
+        for i, g in enumerate(glyphs):
+            w = max(g.length + 2, 0)
+            self.masks[i, :, :w] = g.mask[:, :w]
+
+        self.lengths      = np.array([g.length      for g in glyphs], dtype = np.int64)
+        self.spaceLengths = np.array([g.spaceLength for g in glyphs], dtype = np.int64)
+        self.codes        = np.array([ord(c)        for c in chars],  dtype = np.int32)
+
+_TABLES = {}
+
+cdef object _getTable(object font, str chars):
+    key = (font, chars)
+    if key not in _TABLES:
+        _TABLES[key] = _GlyphTable(STATIC_OBJ.ATLASES[font], chars)
+
+    return _TABLES[key]
+
+# same rule as arrayEQWithTol, for a single channel
+cdef inline bint _EQWithTol(uint8_t a, uint8_t b, int tol) noexcept nogil:
+    cdef uint8_t diff = <uint8_t>(a - b)
+    return diff <= tol or diff >= 255 - tol
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef bint _charCheck(
+    const uint8_t[:, :, ::1] img, const uint8_t[:, :, ::1] bg, const uint8_t[::1] textColor,
+    const uint8_t[:, :, ::1] masks, Py_ssize_t g, Py_ssize_t x, int64_t l, int tol
+) noexcept nogil:
+    cdef Py_ssize_t end = min(x + l + 2, img.shape[1])
+    cdef Py_ssize_t r, j, ch
+
+    for j in range(x, end):
+        for r in range(img.shape[0]):
+            if r < masks.shape[1] and masks[g, r, j - x]:
+                for ch in range(img.shape[2]):
+                    if not _EQWithTol(img[r, j, ch], textColor[ch], tol): return False
+            else:
+                for ch in range(img.shape[2]):
+                    if not _EQWithTol(img[r, j, ch], bg[r, j, ch], tol): return False
+
+    return True
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef bint _columnsEqual(
+    const uint8_t[:, :, ::1] img, const uint8_t[:, :, ::1] bg,
+    Py_ssize_t a, Py_ssize_t b
+) noexcept nogil:
+    cdef Py_ssize_t r, x, ch
+    for r in range(img.shape[0]):
+        for x in range(a, b):
+            for ch in range(img.shape[2]):
+                if img[r, x, ch] != bg[r, x, ch]: return False
+
+    return True
+
+@cython.cdivision(True)
+cdef Py_ssize_t _getAlign(const uint8_t[:, :, ::1] img, const uint8_t[:, :, ::1] bg) noexcept nogil:
+    # this function performs a binarysearch-like algorithm to find the start of text
+
+    cdef Py_ssize_t a = 0
+    cdef Py_ssize_t b = img.shape[1]
+    cdef Py_ssize_t m
+
+    while a < b:
+        m = a + (b - a) // 2
+        if a == m: break
+
+        if _columnsEqual(img, bg, a, m):
+              a = m
+        else: b = m - 1
+
+    return b
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef bint _endsWith(const int32_t[::1] result, Py_ssize_t n, const int32_t[::1] endAt) noexcept nogil:
+    cdef Py_ssize_t i
+    if endAt.shape[0] > n: return False
+
+    for i in range(endAt.shape[0]):
+        if result[n - endAt.shape[0] + i] != endAt[i]: return False
+
+    return True
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _scan(
+    const uint8_t[:, :, ::1] img, const uint8_t[:, :, ::1] bg, const uint8_t[::1] textColor,
+    const uint8_t[:, :, ::1] masks, const int64_t[::1] lengths, const int64_t[::1] spaceLengths,
+    const int32_t[::1] codes, const int32_t[::1] endAt, bint checkEnd, bint misalignFix, int tol,
+    int32_t[::1] result
+) noexcept nogil:
+    cdef Py_ssize_t width = img.shape[1]
+    cdef Py_ssize_t n = 0
+    cdef Py_ssize_t x, g, added
+    cdef int64_t l
+
+    if misalignFix: x = max(_getAlign(img, bg) - 10, 0) # helps with characters that have blank spaces at beginning
+    else:           x = 0
+
+    cdef bint begin = misalignFix
+    while x < width:
+        added = -1
+        for g in range(codes.shape[0]):
+            if begin and codes[g] == 32: continue # space
+
+            # avoids out of bound accesses that read wrong image data
+            l = lengths[g]
+            if x + l >= width:
+                x += l
+                break
+
+            if _charCheck(img, bg, textColor, masks, g, x, l, tol):
+                added = g
+                break
+
+        if added == -1: x += 1
+        else:
+            begin      = False
+            result[n]  = codes[added]
+            n         += 1
+            x         += spaceLengths[added]
+
+        if checkEnd and _endsWith(result, n, endAt): break
+
+    return n
+
+cpdef str parseText(
+    object img, object bg, object font,
+    tuple textColor, str chars,
+    object endAt = None, bint misalignFix = False, object checkFn = charCheck, object lenFn = getCharLength
+):
+    img = np.asarray(img)
+    if bg is not None: bg = np.asarray(bg)
+
+    # anything the scan loop can't handle goes through the regular implementation
+    if (
+        checkFn is not charCheck or lenFn is not getCharLength or
+        font not in STATIC_OBJ.ATLASES or len(chars) == 0 or
+        img.ndim != 3 or bg is None or img.shape != bg.shape or len(textColor) != img.shape[2]
+    ):
+        return _pyParseText(
+            img, bg, font, textColor, chars,
+            endAt = endAt, misalignFix = misalignFix, checkFn = checkFn, lenFn = lenFn
+        )
+
+    if np.array_equal(img, bg): return "" # if fg == bg there's no text
+
+    cdef const uint8_t[:, :, ::1] imgView = np.ascontiguousarray(img, dtype = np.uint8)
+    cdef const uint8_t[:, :, ::1] bgView  = np.ascontiguousarray(bg,  dtype = np.uint8)
+
+    table = _getTable(font, chars)
+    cdef const uint8_t[::1] colorView    = np.asarray(textColor, dtype = np.uint8)
+    cdef const uint8_t[:, :, ::1] masks  = table.masks
+    cdef const int64_t[::1] lengths      = table.lengths
+    cdef const int64_t[::1] spaceLengths = table.spaceLengths
+    cdef const int32_t[::1] codes        = table.codes
+    cdef const int32_t[::1] endAtView    = np.array([ord(c) for c in (endAt or "")], dtype = np.int32)
+    cdef int32_t[::1] result             = np.empty(imgView.shape[1] + 1, dtype = np.int32)
+
+    cdef bint checkEnd = endAt is not None
+    cdef int  tol      = TEXT_RECOGNITION_TOLERANCE
+    cdef Py_ssize_t n
+
+    # the scan only touches memoryviews, so other threads can run meanwhile
+    with nogil:
+        n = _scan(
+            imgView, bgView, colorView, masks, lengths, spaceLengths, codes,
+            endAtView, checkEnd, misalignFix, tol, result
+        )
+
+    cdef str text = "".join([chr(c) for c in result[:n]]).strip()
+    if font is STATIC_OBJ._04B03: return _04b03Fix(text)
+    return text
+
+cpdef object parseDate(object img, object bg, object font, tuple textColor, object endAt = None):
+    data = parseText(img, bg, font, textColor, DATE_CHARS, endAt = endAt).split(".")
+    return date(1900 + int(data[0]), int(data[1]), int(data[2]))
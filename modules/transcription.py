@@ -1,13 +1,14 @@
 from PIL    import Image
 from enum   import Enum
 from typing import Type, ClassVar, TYPE_CHECKING
-import os, pyautogui as pg, numpy as np
+import os, cv2, pyautogui as pg, numpy as np
 
 from modules.constants.screen   import *
 from modules.constants.other    import *
 from modules.utils              import *
 
-from modules.textRecognition import parseText
+from modules.textRecognition import parseText, parseGuided, PhraseTrie
+from modules.templates       import Box, Template, locateExact
 
 import logging
 
@@ -48,14 +49,25 @@ class Transcription:
     NEXT = None
     BACK = None
 
+    # everything the analysis looks for, so textboxes can be read as these phrases
+    PHRASES: ClassVar[dict[Who, PhraseTrie]] = {
+        Who.INSPECTOR: PhraseTrie((
+            ASK_PURPOSE, ASK_DURATION, *ASK_MISSING_DOC.keys(), *DETAIN_PHRASES, *OTHER_DISCREPANCY_PHRASES
+        )),
+        Who.ENTRANT: PhraseTrie((
+            *PURPOSES.keys(), I_DONT_PLAN_TO_LEAVE, *MISSING_DOC_GIVEN, *NO_PURPOSE_SCRIPTED_ENTRANT_PHRASES.keys(),
+            *(f"{stay} {duration}" for stay in RANDOM_STAY for duration in STAY_DURATIONS.keys())
+        ))
+    }
+
     @staticmethod
     def load():
-        Transcription.NEXT = Image.open(
+        Transcription.NEXT = Template(Image.open(
             os.path.join(Transcription.TAS.ASSETS, "transcription", "next.png")
-        ).convert("RGB")
-        Transcription.BACK = Image.open(
+        ).convert("RGB"))
+        Transcription.BACK = Template(Image.open(
             os.path.join(Transcription.TAS.ASSETS, "transcription", "back.png")
-        ).convert("RGB")
+        ).convert("RGB"))
 
     def __init__(self, tas: "TAS"):
         self.conversation: list[Message] = []
@@ -78,39 +90,48 @@ class Transcription:
         self.__currPage  = 0
         self.__tableOffs = (0, 0)
 
+        # where the last update stopped reading, so the next one only parses what's new
+        self.__lastPage = 0
+        self.__lastY    = TRANSCRIPTION_TEXTBOX_TEXT_OFFSET[1]
+
+        # screen positions of the NEXT and BACK buttons of each page, found while reading.
+        # the transcription always lands in the same spot, so they don't need to be looked for again
+        self.__buttons: dict[int, dict[Template, tuple[int, int]]] = {}
+
+        # questions that were asked and are still waiting for an answer
+        self.__getPurpose  = False
+        self.__getDuration = False
+        self.__missingDoc  = None
+
     def reset(self):
         self.conversation.clear()
         self.__purpose.reset()
         self.__duration.reset()
         self.__detainable.reset()
         self.__currPage  = 0
+        self.__lastPage  = 0
+        self.__lastY     = TRANSCRIPTION_TEXTBOX_TEXT_OFFSET[1]
+        self.__buttons.clear()
+
+        self.__getPurpose  = False
+        self.__getDuration = False
+        self.__missingDoc  = None
 
         for value in self.__missingDocs.values():
             value.reset()
 
     def __reducePage(self, page: Image.Image):
-        a = 0
-        b = page.size[1]
-
-        while a < b:
-            m = a + (b - a) // 2
-            if a == m: break
-
-            box = (0, m, page.size[0], b)
-            orig = page.crop(box)
-            test = orig.copy()
-            test.paste(TRANSCRIPTION_BG_COLOR, (0, 0, page.size[0], b - a))
-            if np.array_equal(np.asarray(orig), np.asarray(test)):
-                  b = m
-            else: a = m + 1
-        
-        return page.crop((0, 0, page.size[0], min(a + 10, page.size[1])))
+        # cuts the empty space after the last message
+        bg   = cv2.inRange(np.asarray(page), TRANSCRIPTION_BG_COLOR, TRANSCRIPTION_BG_COLOR)
+        used = np.flatnonzero(cv2.reduce(bg, 1, cv2.REDUCE_MIN)[:, 0] == 0)
+        end  = used[-1] + 1 if len(used) != 0 else 0
+        return page.crop((0, 0, page.size[0], min(end + 10, page.size[1])))
     
-    def __get(self):
-        before = np.asarray(self.__tas.getScreen().crop(TABLE_AREA))
+    def __get(self, capture: bool = True):
+        before = np.asarray(self.__tas.getScreen().crop(TABLE_AREA)) if capture else None
         self.__tas.moveTo(TRANSCRIPTION_POS)
         self.__tas.dragTo(PAPER_SCAN_POS)
-        self.__tas.moveTo(TRANSCRIPTION_POS) # move cursor out of the way
+        self.__tas.moveAway(TRANSCRIPTION_POS) # move cursor out of the way
         return before
     
     def __putBack(self):
@@ -118,9 +139,10 @@ class Transcription:
         self.__tas.dragTo(TRANSCRIPTION_POS)
         self.__tas.moveTo(PAPER_SCAN_POS)
 
-    def __getPages(self) -> list[Image.Image]:
+    def __getPages(self) -> list[tuple[int, Image.Image]]:
         before = self.__get()
         
+        # pages before the last one that was read can't have anything new
         pages = []
         while True:
             img = bgFilter(before, np.asarray(self.__tas.getScreen().crop(TABLE_AREA)))
@@ -128,46 +150,65 @@ class Transcription:
             self.__tableOffs = (min(xs), min(ys))
             fullPage = Image.fromarray(img).crop(self.__tableOffs + (max(xs) + 1, max(ys) + 1))
 
-            pages.append(self.__reducePage(fullPage.crop(TRANSCRIPTION_PAGE_TEXT_AREA)))
+            if self.__currPage >= self.__lastPage:
+                pages.append((self.__currPage, self.__reducePage(fullPage.crop(TRANSCRIPTION_PAGE_TEXT_AREA))))
+
+            buttons = self.__buttons.setdefault(self.__currPage, {})
+            if self.__currPage != 0 and Transcription.BACK not in buttons:
+                box = locateExact(Transcription.BACK, fullPage)
+                if box is not None: buttons[Transcription.BACK] = self.__buttonPos(box)
 
-            box = pg.locate(Transcription.NEXT, fullPage)
+            box = locateExact(Transcription.NEXT, fullPage)
             if box is None: break
+            buttons[Transcription.NEXT] = self.__buttonPos(box)
 
             self.__currPage  += 1
-            self.__tas.click(onTable(pg.center(box)))
+            self.__tas.click(buttons[Transcription.NEXT])
             self.__tas.moveTo(TRANSCRIPTION_POS)
 
         self.__putBack()
         return pages
 
-    def __getTextBoxes(self, pages: list[Image.Image]) -> list[Message]:
+    def __buttonPos(self, box: Box) -> tuple[int, int]:
+        # boxes are found on the page, which starts at the table offset
+        return onTable(offsetPoint(pg.center(box), self.__tableOffs))
+
+    def __flip(self, button: Template, before: np.ndarray | None):
+        pos = self.__buttons.get(self.__currPage, {}).get(button)
+
+        if pos is None:
+            pos = onTable(pg.center(locateExact(button, Image.fromarray(
+                bgFilter(before, np.asarray(self.__tas.getScreen().crop(TABLE_AREA)))
+            ))))
+
+        self.__tas.click(pos)
+
+    def __getTextBoxes(self, pages: list[tuple[int, Image.Image]]) -> list[Message]:
         boxes = []
-        for pageN, page in enumerate(pages):
-            yStart = TRANSCRIPTION_TEXTBOX_TEXT_OFFSET[1]
-            yEnd   = yStart + TRANSCRIPTION_TEXT_Y_SIZE
+        for pageN, page in pages:
+            # rows in between textboxes are all background or all text color, so every row
+            # gets checked at once here, and the walk below just looks them up
+            img  = np.asarray(page)
+            bg   = rowsEQWithTol(img,   TRANSCRIPTION_BG_COLOR, TEXT_RECOGNITION_TOLERANCE)
+            text = rowsEQWithTol(img, TRANSCRIPTION_TEXT_COLOR, TEXT_RECOGNITION_TOLERANCE)
+            gaps = (bg[1:-1] & bg[2:]) | (text[1:-1] & text[2:])
+
+            # the last page that was read continues from the first textbox that wasn't complete yet
+            if pageN == self.__lastPage: yStart = self.__lastY
+            else:                        yStart = TRANSCRIPTION_TEXTBOX_TEXT_OFFSET[1]
+            yEnd = yStart + TRANSCRIPTION_TEXT_Y_SIZE
         
             while True:
                 yTest = yEnd + TRANSCRIPTION_TEXTBOXES_Y_OFFSET
                 
                 if yTest + 3 >= page.size[1]: break
 
-                orig = page.crop((0, yTest + 1, page.size[0], yTest + 3))
-                test0 = orig.copy()
-                test1 = orig.copy()
-                test0.paste(  TRANSCRIPTION_BG_COLOR, (0, 0) + test0.size)
-                test1.paste(TRANSCRIPTION_TEXT_COLOR, (0, 0) + test1.size)
-
-                orig = np.asarray(orig)
-
-                if (
-                    arrayEQWithTol(orig, np.asarray(test0), TEXT_RECOGNITION_TOLERANCE) or
-                    arrayEQWithTol(orig, np.asarray(test1), TEXT_RECOGNITION_TOLERANCE)
-                ):
+                if gaps[yTest]:
                     cropBox = (0, yStart, page.size[0], yEnd)
                     textBox = page.crop(cropBox)
 
                     if arrayEQWithTol(
-                        np.asarray(textBox)[0, 0], np.asarray(TRANSCRIPTION_BG_COLOR, dtype = np.uint8), 
+                        img[yStart, 0], np.asarray(TRANSCRIPTION_BG_COLOR, dtype = np.uint8), 
                         TEXT_RECOGNITION_TOLERANCE
                     ):    who = Who.ENTRANT
                     else: who = Who.INSPECTOR
@@ -183,6 +224,9 @@ class Transcription:
                 else:
                     yEnd = yTest + TRANSCRIPTION_TEXT_Y_SIZE
 
+            self.__lastPage = pageN
+            self.__lastY    = yStart
+
         return boxes
     
     def __parseTextbox(self, textBox: Message) -> Message:
@@ -193,17 +237,36 @@ class Transcription:
             textColor = TRANSCRIPTION_BG_COLOR
             bgColor   = TRANSCRIPTION_TEXT_COLOR
 
-        y   = 0
-        res = ""
+        y    = 0
+        res  = ""
+        node = Transcription.PHRASES[textBox.who].root
         while y + TRANSCRIPTION_TEXT_Y_SIZE <= textBox.message.size[1]:
             textImg = textBox.message.crop((0, y, textBox.message.size[0], y + TRANSCRIPTION_TEXT_Y_SIZE))
             bg = textImg.copy()
             bg.paste(bgColor, (0, 0) + bg.size)
 
-            res += parseText(
-                textImg, bg, Transcription.TAS.FONTS["04b03"], textColor, TRANSCRIPTION_CHARS, 
-                endAt = "  " 
-            )
+            # lines are read as known phrases as long as they can be one,
+            # and once only one phrase is left the rest of the textbox is skipped
+            line = None
+            if node is not None:
+                line = parseGuided(
+                    textImg, bg, Transcription.TAS.FONTS["04b03"], textColor, TRANSCRIPTION_CHARS, node, 
+                    endAt = "  "
+                )
+
+            if line is None:
+                node  = None
+                res  += parseText(
+                    textImg, bg, Transcription.TAS.FONTS["04b03"], textColor, TRANSCRIPTION_CHARS, 
+                    endAt = "  " 
+                )
+            else:
+                node = PhraseTrie.walk(node, line)
+                if node is not None:
+                    if node.phrase is not None: return Message(textBox.who, node.phrase, textBox.at)
+                    node = node.children.get(" ") # lines break on spaces
+
+                res += line
 
             y   += TRANSCRIPTION_TEXT_Y_SIZE + TRANSCRIPTION_LINE_OFFSET
             res += " "
@@ -211,9 +274,10 @@ class Transcription:
         return Message(textBox.who, res.strip(), textBox.at)
     
     def __analyze(self, conversation: list[Message]):
-        getPurpose  = False
-        getDuration = False
-        missingDoc  = None
+        # picks up from the previous update, so questions asked before can be answered in the new messages
+        getPurpose  = self.__getPurpose
+        getDuration = self.__getDuration
+        missingDoc  = self.__missingDoc
 
         for message in conversation:
             if message.who == Who.INSPECTOR:
@@ -284,15 +348,21 @@ class Transcription:
                     missingDoc = None
                     continue
 
+        self.__getPurpose  = getPurpose
+        self.__getDuration = getDuration
+        self.__missingDoc  = missingDoc
+
     def update(self):
         pages = self.__getPages()
         if pages is None: return
 
-        self.conversation = [self.__parseTextbox(box) for box in self.__getTextBoxes(pages)]
-        self.__analyze(self.conversation)
+        # only textboxes that appeared since the last update get read
+        new = [self.__parseTextbox(box) for box in self.__getTextBoxes(pages)]
+        self.conversation += new
+        self.__analyze(new)
 
         if Transcription.TAS.SETTINGS["debug"]:
-            for line in self.conversation:
+            for line in new:
                 logger.info(line)
 
     def __getPos(self, field: AnalyzeData) -> tuple[int, int, int, int] | None:
@@ -302,21 +372,19 @@ class Transcription:
         if field.message is None:
             return None
         
-        if field.message.at.page != self.__currPage:
-            before = self.__get()
-
-            if self.__currPage < field.message.at.page:    
-                while self.__currPage < field.message.at.page:
-                    self.__tas.click(onTable(pg.center(pg.locate(Transcription.NEXT, Image.fromarray(
-                        bgFilter(before, np.asarray(self.__tas.getScreen().crop(TABLE_AREA)))
-                    )))))
-                    self.__currPage += 1
+        page = field.message.at.page
+        if page != self.__currPage:
+            # the screen only needs to be read if a button wasn't found while reading
+            if self.__currPage < page:
+                path = [(p, Transcription.NEXT) for p in range(self.__currPage, page)]
             else:
-                while self.__currPage > field.message.at.page:
-                    self.__tas.click(onTable(pg.center(pg.locate(Transcription.BACK, Image.fromarray(
-                        bgFilter(before, np.asarray(self.__tas.getScreen().crop(TABLE_AREA)))
-                    )))))
-                    self.__currPage -= 1
+                path = [(p, Transcription.BACK) for p in range(self.__currPage, page, -1)]
+
+            before = self.__get(any(button not in self.__buttons.get(p, {}) for p, button in path))
+
+            for _, button in path:
+                self.__flip(button, before)
+                self.__currPage += 1 if button is Transcription.NEXT else -1
 
             self.__putBack()
 
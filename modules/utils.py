@@ -49,6 +49,26 @@ def arrayEQWithTol(a: np.ndarray, b: np.ndarray, tol: int) -> bool:
     diff[diff >= 255 - tol] = 0
     return (diff <= tol).all()
 
+def rowsEQWithTol(img: np.ndarray, color: tuple[int, int, int], tol: int) -> np.ndarray:
+    # for each row, whether all of its pixels are the given color (same tolerance rule as arrayEQWithTol)
+    lo = np.asarray(color) - tol - 1
+    hi = np.asarray(color) + tol
+
+    # differences wrap around in arrayEQWithTol, which a plain range can't do
+    if (lo < 0).any() or (hi > 255).any():
+        diff = img - np.asarray(color, dtype = np.uint8)
+        diff += tol + 1
+        return (diff <= 2 * tol + 1).all(axis = (1, 2))
+    
+    return cv2.reduce(cv2.inRange(img, lo, hi), 1, cv2.REDUCE_MIN)[:, 0] != 0
+
+def cropArray(img: np.ndarray, box: tuple[int, int, int, int]) -> np.ndarray:
+    # behaves like PIL's crop, so areas outside of the image are filled with zeros
+    res = np.zeros((box[3] - box[1], box[2] - box[0]) + img.shape[2:], dtype = img.dtype)
+    src = img[max(box[1], 0):box[3], max(box[0], 0):box[2]]
+    res[max(-box[1], 0):max(-box[1], 0) + src.shape[0], max(-box[0], 0):max(-box[0], 0) + src.shape[1]] = src
+    return res
+
 def replaceColor(img: np.ndarray, srcColor: tuple[int, int, int], dstColor: tuple[int, int, int]) -> None:
     img[(img == srcColor).all(axis = -1)] = dstColor
 
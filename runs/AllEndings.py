@@ -778,7 +778,7 @@ class AllEndings(Run):
         if ezic:
             # open passport drawer
             self.tas.click(PASSPORT_CONFISCATE_POS)
-            time.sleep(PASSPORT_DRAWER_OPEN_TIME)
+            self.tas.waitAnimation(PASSPORT_DRAWER_AREA, PASSPORT_DRAWER_OPEN_TIME)
             # give passport to ezic agent
             self.tas.moveTo(self.tas.waitFor(self.tas.PASSPORT_KORDON_KALLO))
             self.tas.dragToWithGive(PERSON_PASSPORT_POS)
@@ -786,7 +786,7 @@ class AllEndings(Run):
             self.tas.waitForGiveAreaChange(sleep = False) 
             # close drawer
             self.tas.click(PASSPORT_CONFISCATE_POS) 
-            time.sleep(PASSPORT_DRAWER_CLOSE_TIME)
+            self.tas.waitAnimation(PASSPORT_DRAWER_AREA, PASSPORT_DRAWER_CLOSE_TIME)
             # allow
             self.tas.passportOnlyAllow(nextCheck = False) 
 
@@ -900,7 +900,7 @@ class AllEndings(Run):
             self.tas.next()
             # close drawer
             self.tas.click(PASSPORT_CONFISCATE_POS) 
-            time.sleep(PASSPORT_DRAWER_CLOSE_TIME)
+            self.tas.waitAnimation(PASSPORT_DRAWER_AREA, PASSPORT_DRAWER_CLOSE_TIME)
             self.tas.day27Check(nextCheck = False)
         else: 
             self.tas.knownCriminal(self.tas.day27Check)
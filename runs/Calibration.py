@@ -0,0 +1,235 @@
+from modules.run import Run
+from typing      import Callable
+import time, numpy as np
+
+from modules.constants.screen import *
+from modules.constants.delays import *
+from modules.utils            import *
+
+from modules.documents.passport import Passport
+
+import logging
+
+logger = logging.getLogger('tas.' + __name__)
+
+# a delay has to work this many times in a row to be accepted
+CALIBRATION_TRIES = 3
+# the search stops once the shortest delay is known to within a frame
+CALIBRATION_PRECISION = 1 / 60
+# if a delay doesn't work on this machine, it's doubled up to this many times before giving up
+CALIBRATION_MAX_DOUBLINGS = 2
+# measured delays get some slack, since the game doesn't always take the same time
+CALIBRATION_MARGIN = 1.25
+# entrants called while looking for one that can be interrogated
+CALIBRATION_ENTRANTS = 6
+
+class Calibration(Run):
+    @staticmethod
+    def description():
+        return (
+            "** Delay calibration **\n"
+            "Finds the shortest delays that work on this machine and saves them to config/timings.json.\n"
+            "Start from the main menu. Needs the day 2 save. A few entrants get called and denied along the way.\n"
+            "Restart the bot to use the new timings."
+        )
+
+    @staticmethod
+    def sleepUntil(end: float) -> None:
+        # time.sleep isn't precise enough on every OS for delays this short
+        while time.perf_counter() < end: pass
+
+    def area(self, box: tuple[int, int, int, int]) -> np.ndarray:
+        # straight from the screen, without waiting for the last input to settle
+        return np.asarray(self.tas.grabScreen().crop(box))
+
+    def works(self, trial: Callable[[float], bool], delay: float) -> bool:
+        return all(trial(delay) for _ in range(CALIBRATION_TRIES))
+
+    def search(self, name: str, trial: Callable[[float], bool], current: float) -> float | None:
+        """Binary searches the shortest delay for which a trial passes.
+
+        Args:
+            name: Name of the delay in modules/constants/delays.py.
+            trial: Does whatever the delay is for, waiting the given delay, and tells whether it worked.
+            current: The delay in use right now. The search starts from it.
+
+        Returns:
+            The delay to use, with some margin, or None if not even the longest tried delay worked.
+        """
+        logger.info(f"Calibrating {name}...")
+
+        hi = current
+        for _ in range(CALIBRATION_MAX_DOUBLINGS):
+            if self.works(trial, hi): break
+            hi *= 2
+        else:
+            if not self.works(trial, hi):
+                logger.warning(f"{name} doesn't work even with {hi}s, leaving it as is")
+                return None
+
+        lo = 0.0
+        while hi - lo > CALIBRATION_PRECISION:
+            mid = (lo + hi) / 2
+            if self.works(trial, mid): hi = mid
+            else:                      lo = mid
+
+        delay = round(hi * CALIBRATION_MARGIN, 3)
+        logger.info(f"{name}: {delay}s (was {current}s)")
+        return delay
+
+    def animationTrial(
+        self, act: Callable[[], None], undo: Callable[[], None],
+        box: tuple[int, int, int, int], longest: float
+    ) -> Callable[[float], bool]:
+        """Trial for delays that wait for an animation: passes if the area already looks like it will in the end."""
+        def trial(delay: float) -> bool:
+            act()
+            start = time.perf_counter()
+            Calibration.sleepUntil(start + delay)
+            early = self.area(box)
+
+            Calibration.sleepUntil(start + longest)
+            ok = np.array_equal(early, self.area(box))
+
+            undo()
+            return ok
+
+        return trial
+
+    def stampOpenTrial(self) -> Callable[[float], bool]:
+        def undo():
+            self.tas.click(STAMP_DISABLE)
+            time.sleep(STAMP_CLOSE_TIME * 2)
+
+        return self.animationTrial(lambda: self.tas.click(STAMP_ENABLE), undo, STAMP_BAR_AREA, STAMP_OPEN_TIME * 2)
+
+    def stampCloseTrial(self) -> Callable[[float], bool]:
+        def act():
+            self.tas.click(STAMP_ENABLE)
+            time.sleep(STAMP_OPEN_TIME * 2)
+            self.tas.click(STAMP_DISABLE)
+
+        return self.animationTrial(act, lambda: None, STAMP_BAR_AREA, STAMP_CLOSE_TIME * 2)
+
+    def shutterOpenTrial(self) -> Callable[[float], bool]:
+        # the shutter is closed at the start of the day
+        def undo():
+            self.tas.click(SHUTTER_LEVER)
+            time.sleep(SHUTTER_OPEN_TIME * 2)
+
+        return self.animationTrial(lambda: self.tas.click(SHUTTER_LEVER), undo, SHUTTER_AREA, SHUTTER_OPEN_TIME * 2)
+
+    def shutterCloseTrial(self) -> Callable[[float], bool]:
+        def act():
+            self.tas.click(SHUTTER_LEVER)
+            time.sleep(SHUTTER_OPEN_TIME * 2)
+            self.tas.click(SHUTTER_LEVER)
+
+        return self.animationTrial(act, lambda: None, SHUTTER_AREA, SHUTTER_OPEN_TIME * 2)
+
+    def drag(self, at: tuple[int, int]) -> None:
+        # same as NewTAS.dragTo, without the wait after releasing that's being measured
+        self.tas.input.mouseDown()
+        self.tas.moveTo(at)
+        time.sleep(MOMENTUM_STOP_TIME)
+        self.tas.input.mouseUp()
+        self.tas.invalidateFrame()
+
+    def dragReleaseTrial(self) -> Callable[[float], bool]:
+        """Trial for the wait after a drag: the rulebook is dragged to the table and right back, then has to be where it started."""
+        def trial(delay: float) -> bool:
+            before = self.area(TABLE_AREA)
+
+            # the input engine would wait after releases by itself, so only the delay being measured is left
+            settleTimes = self.tas.input.settleTimes
+            self.tas.input.settleTimes = dict(settleTimes, up = 0)
+
+            self.tas.moveTo(RULEBOOK_POS)
+            self.drag(PAPER_SCAN_POS)
+            Calibration.sleepUntil(time.perf_counter() + delay)
+            self.drag(RULEBOOK_POS)
+
+            self.tas.input.settleTimes = settleTimes
+
+            time.sleep(1)
+            ok = np.array_equal(before, self.area(TABLE_AREA))
+            if not ok:
+                # the second drag didn't happen, so the rulebook is still open on the table
+                self.tas.moveTo(PAPER_SCAN_POS)
+                self.tas.dragTo(RULEBOOK_POS)
+                time.sleep(1)
+
+            return ok
+
+        return trial
+
+    def findExpiredPassport(self) -> Passport | None:
+        """Calls entrants until one has an expired passport, which can always be interrogated about. The others are denied."""
+        for _ in range(CALIBRATION_ENTRANTS):
+            if self.tas.next(): return None # day is over
+
+            passport = self.tas.docScan()
+            if type(passport) is Passport and passport.expiration <= self.tas.date: return passport
+
+            self.tas.denyAndGive()
+
+        return None
+
+    def interrogateTrial(self, passport: Passport) -> Callable[[float], bool]:
+        """Trial for the wait after interrogating: the dialog has to show up in the booth within the delay."""
+        def trial(delay: float) -> bool:
+            # same discrepancy the runs interrogate about for expired documents
+            self.tas.click(INSPECT_BUTTON)
+            self.tas.click(onTable(centerOf(passport.getTableBox("expiration"))))
+            self.tas.click(CLOCK_POS)
+            time.sleep(INSPECT_INTERROGATE_TIME)
+
+            before = self.area(PERSON_AREA)
+            self.tas.click(INTERROGATE_BUTTON)
+            Calibration.sleepUntil(time.perf_counter() + delay)
+            ok = not np.array_equal(before, self.area(PERSON_AREA))
+
+            # lets the conversation end before the next try
+            time.sleep(INSPECT_INTERROGATE_TIME * 2)
+            return ok
+
+        return trial
+
+    def run(self):
+        # frames get captured directly here, so the capture thread would only be in the way
+        self.tas.stopCapture()
+
+        self.tas.restartFrom((DAYS_X[1], DAYS_Y[0]), self.tas.DAY_2)
+        self.tas.daySetup()
+
+        # openShutter and closeShutter share a delay, so both directions are tried
+        trials = {
+            "STAMP_OPEN_TIME":   [(self.stampOpenTrial(),  STAMP_OPEN_TIME)],
+            "STAMP_CLOSE_TIME":  [(self.stampCloseTrial(), STAMP_CLOSE_TIME)],
+            "SHUTTER_OPEN_TIME": [(self.shutterOpenTrial(), SHUTTER_OPEN_TIME), (self.shutterCloseTrial(), SHUTTER_OPEN_TIME)]
+        }
+
+        # the wait after drags only exists in the experimental version, which replaces dragTo.
+        # tas_experimental.py is usually run as __main__, so its class can't be imported to check against
+        from tas import TAS
+        if type(self.tas).dragTo is not TAS.dragTo:
+            trials["DRAG_RELEASE_TIME"] = [(self.dragReleaseTrial(), DRAG_RELEASE_TIME)]
+
+        timings = {}
+        for name, nameTrials in trials.items():
+            delays = [self.search(name, trial, current) for trial, current in nameTrials]
+
+            # a delay is only safe if it works everywhere it's used
+            if None not in delays: timings[name] = max(delays)
+
+        # needs an entrant, so it goes last
+        passport = self.findExpiredPassport()
+        if passport is None: logger.warning("No entrant with an expired passport showed up, leaving INTERROGATE_TIME as is")
+        else:
+            delay = self.search("INTERROGATE_TIME", self.interrogateTrial(passport), INTERROGATE_TIME)
+            if delay is not None: timings["INTERROGATE_TIME"] = delay
+
+            self.tas.denyAndGive()
+
+        saveTimings(timings)
+        logger.info(f'Saved {len(timings)} timings to "{TIMINGS_FILE}". Restart the bot to use them')
@@ -28,13 +28,14 @@
 # - maybe make a simple scripting language for runs
 # - ~~linux compatibility~~ (technically done but not quite. also not tested)
 
-from PIL               import ImageGrab, ImageFont, Image
-from pathlib           import Path
-from deskew            import determine_skew
-from datetime          import date, timedelta
-from skimage.color     import rgb2gray
-from skimage.transform import rotate
-from typing            import Callable, ClassVar, Type, TYPE_CHECKING
+from PIL                import ImageGrab, ImageFont, Image
+from pathlib            import Path
+from deskew             import determine_skew
+from datetime           import date, timedelta
+from skimage.color      import rgb2gray
+from skimage.transform  import rotate
+from typing             import Callable, ClassVar, Type, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
 import platform, time, os, math, pyautogui as pg, numpy as np
 
 from modules.constants.delays import *
@@ -42,12 +43,19 @@ from modules.constants.screen import *
 from modules.constants.other  import *
 from modules.utils            import *
 
-from modules.textRecognition          import STATIC_OBJ, parseText, digitCheck, digitLength
+from modules.capture                  import ScreenCapture, CaptureThread
+from modules.frames                   import Frames, FrameCache, Settled
+from modules.input                    import InputEngine, Gesture, getBackend
+from modules.templates                import Template, Box, locate, locateExact
+from modules.textRecognition          import STATIC_OBJ, OCR_CACHE, parseText, digitCheck, digitLength, loadGlyphAtlases
 from modules.faceRecognition          import Face
 from modules.transcription            import Transcription
 from modules.person                   import Person
 from modules.documentStack            import DocumentStack, TASException
 from modules.documents.document       import Document, BaseDocument
+from modules.documents.labelIndex     import LabelIndex
+from modules.documents.palette        import PaletteClassifier
+from modules.documents.seals          import SealBank
 from modules.documents.entryTicket    import EntryTicket
 from modules.documents.entryPermit    import EntryPermit
 from modules.documents.workPass       import WorkPass
@@ -86,6 +94,26 @@ class TAS:
     # so i'm keeping this off. it's not fully tested so enable at your own risk
     WANTED_CHECK: ClassVar[bool] = False
 
+    # text recognition results are cached by field content. set a file path to keep them between sessions
+    OCR_CACHE_SIZE: ClassVar[int]        = 4096
+    OCR_CACHE_FILE: ClassVar[str | None] = None
+
+    # parses the fields of scanned documents in background while the bot moves them around
+    PREFETCH_FIELDS: ClassVar[bool] = True
+    PREFETCH_WORKERS: ClassVar[int] = 4
+
+    # captures the window in background, so wait loops get frames as soon as they're ready
+    # instead of waiting for captures. the last CAPTURE_BUFFER frames are kept for debugging
+    CAPTURE_THREAD: ClassVar[bool] = False
+    CAPTURE_BUFFER: ClassVar[int]  = 8
+
+    # templates with an expected area are only looked for in there. set this to search the whole window when they're not found
+    LOCATE_FALLBACK: ClassVar[bool] = False
+
+    # waits for animations (stamp bar, shutter, passport drawer) to be over on screen instead of
+    # for their worst case duration, which becomes a timeout. it's not fully tested so enable at your own risk
+    ADAPTIVE_WAITS: ClassVar[bool] = False
+
     PROGRAM_DIR: ClassVar[str] = str(Path(__file__).parent.absolute())
     RUNS_DIR: ClassVar[str]    = os.path.join(PROGRAM_DIR, "runs")
     ASSETS: ClassVar[str]      = os.path.join(PROGRAM_DIR, "assets")
@@ -107,30 +135,35 @@ class TAS:
     DAY_29: ClassVar[date] = date(1982, 12, 21) # you can now confiscate and keep obristan passports
 
     DOCUMENTS: ClassVar[list[Type[Document]]]          = None
-    MOA_SEALS: ClassVar[tuple[Image.Image, ...]]       = None
+    MOA_SEALS: ClassVar[SealBank]                      = None
     PASSPORT_TYPES: ClassVar[tuple[PassportType, ...]] = None
 
+    DOCUMENT_LABELS: ClassVar[LabelIndex[Type[Document]]] = None
+    PASSPORT_LABELS: ClassVar[LabelIndex[PassportType]]   = None
+
+    PASSPORT_PALETTES: ClassVar[PaletteClassifier[PassportType]] = None
+
     NEXT_BUBBLE: ClassVar[np.ndarray]            = None
-    MATCHING_DATA: ClassVar[Image.Image]         = None
-    MATCHING_DATA_LINES: ClassVar[Image.Image]   = None
-    VISA_SLIP: ClassVar[Image.Image]             = None
+    MATCHING_DATA: ClassVar[Template]            = None
+    MATCHING_DATA_LINES: ClassVar[Template]      = None
+    VISA_SLIP: ClassVar[Template]                = None
     WEIGHT_BG: ClassVar[np.ndarray]              = None
     WEIGHT_FILTER: ClassVar[np.ndarray]          = None
-    BUTTONS: ClassVar[dict[str, Image.Image]]    = None
+    BUTTONS: ClassVar[dict[str, Template]]       = None
     DOLLAR_SIGN: ClassVar[Image.Image]           = None
-    WANTED_CRIMINALS: ClassVar[Image.Image]      = None
-    NO_CORRELATION: ClassVar[Image.Image]        = None
-    SCREW: ClassVar[Image.Image]                 = None
-    WIRES: ClassVar[Image.Image]                 = None
-    TRANQ_GUN_KEYHOLE: ClassVar[Image.Image]     = None
-    SNIPER_KEYHOLE: ClassVar[Image.Image]        = None
-    DARTS: ClassVar[Image.Image]                 = None
-    BULLETS: ClassVar[Image.Image]               = None
+    WANTED_CRIMINALS: ClassVar[Template]         = None
+    NO_CORRELATION: ClassVar[Template]           = None
+    SCREW: ClassVar[Template]                    = None
+    WIRES: ClassVar[Template]                    = None
+    TRANQ_GUN_KEYHOLE: ClassVar[Template]        = None
+    SNIPER_KEYHOLE: ClassVar[Template]           = None
+    DARTS: ClassVar[Template]                    = None
+    BULLETS: ClassVar[Template]                  = None
     SEIZURE_SLIP: ClassVar[Image.Image]          = None
-    TICKS: ClassVar[dict[str, Image.Image]]      = None
-    GIVE_BANNER: ClassVar[Image.Image]           = None
+    TICKS: ClassVar[dict[str, Template]]         = None
+    GIVE_BANNER: ClassVar[Template]              = None
     PASSPORT_KORDON_KALLO: ClassVar[Image.Image] = None
-    CLOSE_BUTTON: ClassVar[Image.Image]          = None
+    CLOSE_BUTTON: ClassVar[Template]             = None
 
     SEX_F_GENERIC: ClassVar[np.ndarray]  = None
     SEX_M_OBRISTAN: ClassVar[np.ndarray] = None
@@ -153,6 +186,7 @@ class TAS:
     shutter: bool
     sTime: float | None
     endingsTime: dict[int, float]
+    droppedInputs: dict[date, dict[str, int]]
     lastGiveArea: np.ndarray | None
     wanted: list[tuple[int, int]]
     currRun: "Run"
@@ -160,10 +194,16 @@ class TAS:
     person:        Person
     documentStack: DocumentStack
     transcription: Transcription
+    fieldParser:   ThreadPoolExecutor | None
+    capture:       ScreenCapture
+    frameCache:    FrameCache
+    captureThread: CaptureThread
+    frameSeq:      int
+    input:         InputEngine
 
     def __init__(self):
         pg.useImageNotFoundException(False)
-        pg.PAUSE = 0.05
+        pg.PAUSE = 0 # input waits are handled by the input engine
 
         if WINDOWS: self.hwnd   = None
         else:       self.winPos = None
@@ -196,10 +236,24 @@ class TAS:
         self.sTime       = None
         self.endingsTime = {}
 
+        # input actions that never got sent, for each day that was played
+        self.droppedInputs = {}
+
         self.wanted = []
 
         self.currRun = None
+
+        self.fieldParser = None # started with the run, in startCapture
         
+        self.capture    = ScreenCapture()
+        self.frameCache = FrameCache()
+
+        self.captureThread = CaptureThread(self.grabScreen, TAS.CAPTURE_BUFFER)
+        self.frameSeq      = 0
+
+        if LOADED_TIMINGS: logger.info(f"Using calibrated timings for {', '.join(LOADED_TIMINGS)}")
+        self.input = InputEngine(getBackend(), INPUT_SETTLE_TIMES, INPUT_SETTLE_FRAMES, self.frameCache.frames)
+
         self.person        = Person()
         self.documentStack = DocumentStack(self)
         self.transcription = Transcription(self)
@@ -209,19 +263,20 @@ class TAS:
             os.path.join(TAS.ASSETS, "nextBubble.png")
         ).convert("RGB"))
 
-        TAS.MATCHING_DATA = Image.open(
+        # parts of the message can blend with what's under it, so this isn't looked for exactly
+        TAS.MATCHING_DATA = Template(Image.open(
             os.path.join(TAS.ASSETS, "matchingData.png")
-        ).convert("RGB")
-        TAS.MATCHING_DATA_LINES = Image.open(
+        ).convert("RGB"), confidence = 0.999)
+        TAS.MATCHING_DATA_LINES = Template(Image.open(
             os.path.join(TAS.ASSETS, "matchingDataLines.png")
-        ).convert("RGB")
-        TAS.NO_CORRELATION = Image.open(
+        ).convert("RGB"))
+        TAS.NO_CORRELATION = Template(Image.open(
             os.path.join(TAS.ASSETS, "noCorrelation.png")
-        ).convert("RGB")
+        ).convert("RGB"))
 
-        TAS.VISA_SLIP = np.asarray(doubleImage(Image.open(
+        TAS.VISA_SLIP = Template(np.asarray(doubleImage(Image.open(
             os.path.join(TAS.ASSETS, "papers", "VisaSlipInner.png")
-        ).convert("RGB")))
+        ).convert("RGB"))), region = TABLE_AREA)
         TAS.SEIZURE_SLIP = np.asarray(doubleImage(Image.open(
             os.path.join(TAS.ASSETS, "papers", "SeizureSlipInner.png")
         ).convert("RGB")))
@@ -237,52 +292,55 @@ class TAS:
         TAS.DOLLAR_SIGN = Image.open(
             os.path.join(TAS.ASSETS, "dollarSign.png")
         ).convert("RGB")
-        TAS.WANTED_CRIMINALS = Image.open(
+        TAS.WANTED_CRIMINALS = Template(Image.open(
             os.path.join(TAS.ASSETS, "wantedCriminals.png")
-        ).convert("RGB")
-        TAS.SCREW = Image.open(
+        ).convert("RGB"), region = TABLE_AREA)
+        TAS.SCREW = Template(Image.open(
             os.path.join(TAS.ASSETS, "screw.png")
-        ).convert("RGB")
-        TAS.WIRES = Image.open(
+        ).convert("RGB"), region = TABLE_AREA)
+        TAS.WIRES = Template(Image.open(
             os.path.join(TAS.ASSETS, "wires.png")
-        ).convert("RGB")
-        TAS.TRANQ_GUN_KEYHOLE = Image.open(
+        ).convert("RGB"), region = TABLE_AREA)
+        TAS.TRANQ_GUN_KEYHOLE = Template(Image.open(
             os.path.join(TAS.ASSETS, "tranqGunKeyHole.png")
-        ).convert("RGB")
-        TAS.SNIPER_KEYHOLE = Image.open(
+        ).convert("RGB"))
+        TAS.SNIPER_KEYHOLE = Template(Image.open(
             os.path.join(TAS.ASSETS, "sniperKeyHole.png")
-        ).convert("RGB")
-        TAS.DARTS = Image.open(
+        ).convert("RGB"))
+        TAS.DARTS = Template(Image.open(
             os.path.join(TAS.ASSETS, "darts.png")
-        ).convert("RGB")
-        TAS.BULLETS = Image.open(
+        ).convert("RGB"), region = TABLE_AREA)
+        TAS.BULLETS = Template(Image.open(
             os.path.join(TAS.ASSETS, "bullets.png")
-        ).convert("RGB")
-        TAS.GIVE_BANNER = Image.open(
+        ).convert("RGB"), region = TABLE_AREA)
+        TAS.GIVE_BANNER = Template(Image.open(
             os.path.join(TAS.ASSETS, "give.png")
-        ).convert("RGB")
+        ).convert("RGB"), region = PERSON_AREA)
         TAS.PASSPORT_KORDON_KALLO = Image.open(
             os.path.join(TAS.ASSETS, "passportKordonKallo.png")
         ).convert("RGB")
-        TAS.CLOSE_BUTTON = Image.open(
+        TAS.CLOSE_BUTTON = Template(Image.open(
             os.path.join(TAS.ASSETS, "closeButton.png")
-        ).convert("RGB")
+        ).convert("RGB"))
 
         sealsPath = os.path.join(TAS.ASSETS, "sealsMOA")
-        TAS.MOA_SEALS = tuple(
+        TAS.MOA_SEALS = SealBank(
             Image.open(os.path.join(sealsPath, file)).convert("RGB") 
             for file in os.listdir(sealsPath)
         )
 
         buttonsPath = os.path.join(TAS.ASSETS, "buttons")
         TAS.BUTTONS = {
-            file.split(".")[0]: Image.open(os.path.join(buttonsPath, file)).convert("RGB") 
+            file.split(".")[0]: Template(
+                Image.open(os.path.join(buttonsPath, file)).convert("RGB"),
+                region = BUTTON_AREAS.get(file.split(".")[0])
+            )
             for file in os.listdir(buttonsPath)
         }
 
         ticksPath = os.path.join(TAS.ASSETS, "ticks")
         TAS.TICKS = {
-            file.split(".")[0]: Image.open(os.path.join(ticksPath, file)).convert("RGB") 
+            file.split(".")[0]: Template(Image.open(os.path.join(ticksPath, file)).convert("RGB"))
             for file in os.listdir(ticksPath)
         }
 
@@ -451,6 +509,13 @@ class TAS:
         STATIC_OBJ.MINI_KYLIE = TAS.FONTS["mini-kylie"]
         STATIC_OBJ._04B03     = TAS.FONTS["04b03"]
 
+        logger.info("Prerendering glyphs...")
+        loadGlyphAtlases((font for font in TAS.FONTS.values() if isinstance(font, ImageFont.FreeTypeFont)), TEXT_CHARS)
+
+        OCR_CACHE.resize(TAS.OCR_CACHE_SIZE)
+        if TAS.OCR_CACHE_FILE is not None:
+            OCR_CACHE.load(TAS.OCR_CACHE_FILE)
+
         Face.TAS          = TAS
         Passport.TAS      = TAS
         Document.TAS      = TAS
@@ -467,11 +532,29 @@ class TAS:
             DocumentSubclass.TAS = TAS
             DocumentSubclass.load()
 
+        logger.info("Indexing document labels...")
+        TAS.loadLabelIndexes()
+
         logger.info("TASBOT initialized!")
 
+    @staticmethod
+    def loadLabelIndexes() -> None:
+        """Builds the indexes used to identify documents. Has to be called again if DOCUMENTS or PASSPORT_TYPES change."""
+        TAS.DOCUMENT_LABELS = LabelIndex()
+        for Document in TAS.DOCUMENTS:
+            TAS.DOCUMENT_LABELS.add(*Document.getLabel(), Document)
+
+        TAS.PASSPORT_LABELS = LabelIndex()
+        for passportType in TAS.PASSPORT_TYPES:
+            TAS.PASSPORT_LABELS.add(passportType.layout.label, passportType.backgrounds.label, passportType)
+
+        TAS.PASSPORT_PALETTES = PaletteClassifier()
+        for passportType in TAS.PASSPORT_TYPES:
+            TAS.PASSPORT_PALETTES.add(passportType.outerTexture, passportType)
+
     @staticmethod
     def getWinPos() -> tuple[int, int]:
-        pos = pg.locateOnScreen(TAS.CLOSE_BUTTON)
+        pos = locateExact(TAS.CLOSE_BUTTON, ImageGrab.grab())
         if pos is None:
             raise TASException("Unable to get window position")
         return offsetPoint(tuple(pos), (-CLOSE_BUTTON_OFFSET[0], -CLOSE_BUTTON_OFFSET[1]))
@@ -500,13 +583,13 @@ class TAS:
                 
             raise TASException('No "Papers Please" window was found')
         
-        def getScreen(self) -> Image.Image:
-            """Get a screenshot of the window in its current state.
+        def grabScreen(self) -> Image.Image:
+            """Capture the window in its current state, bypassing the frame cache.
 
             Returns:
                 Screenshot of the window as an Image in RGB format.
             """
-            return ImageGrab.grab(win32gui.GetWindowRect(self.hwnd)).convert("RGB")
+            return self.capture.grab(win32gui.GetWindowRect(self.hwnd))
         
         def mouseOffset(self, x: int, y: int) -> tuple[int, int]:
             """Converts point from window coordinates to screen coordinates."""
@@ -517,33 +600,194 @@ class TAS:
         def getWinHWND() -> str:
             raise NotImplementedError
         
-        def getScreen(self) -> Image.Image:
-            """Get a screenshot of the window in its current state.
+        def grabScreen(self) -> Image.Image:
+            """Capture the window in its current state, bypassing the frame cache.
 
             Returns:
                 Screenshot of the window as an Image in RGB format.
             """
-            return ImageGrab.grab(self.winPos + offsetPoint(WINDOW_SIZE, self.winPos)).convert("RGB")
+            return self.capture.grab(self.winPos + offsetPoint(WINDOW_SIZE, self.winPos))
         
         def mouseOffset(self, x: int, y: int) -> tuple[int, int]:
             """Converts point from window coordinates to screen coordinates."""
             return offsetPoint((x, y), self.winPos)
 
+    def getScreen(self) -> Image.Image:
+        """Get a screenshot of the window in its current state.
+
+        Captures taken within the same frame are shared, so the returned image must not be modified.
+
+        Returns:
+            Screenshot of the window as an Image in RGB format.
+        """
+        self.settleInput()
+        return self.frameCache.screen(self.nextFrame if self.captureThread.running else self.grabScreen)
+
+    def nextFrame(self) -> Image.Image:
+        """Waits for the capture thread to capture a frame newer than the last one used, and returns it."""
+        self.frameSeq, screen = self.captureThread.waitNext(self.frameSeq)
+        return screen
+
+    def grabRegion(self, box: tuple[int, int, int, int]) -> Image.Image:
+        """Capture an area of the window, without capturing the rest of it and bypassing the frame cache."""
+        return self.capture.grab(self.mouseOffset(*box[:2]) + self.mouseOffset(*box[2:]))
+
+    def getRegion(self, box: tuple[int, int, int, int]) -> Image.Image:
+        """Get a screenshot of an area of the window, without capturing the rest of it.
+
+        If the whole window was already captured in this frame, the area is cropped from that capture.
+
+        Args:
+            box: The (left, top, right, bottom) of the area in window coordinates.
+
+        Returns:
+            Screenshot of the area as an Image in RGB format.
+        """
+        # the capture thread always captures the whole window anyway
+        if self.captureThread.running: return self.getScreen().crop(box)
+
+        self.settleInput()
+        return self.frameCache.region(box, self.grabRegion)
+
+    def settleInput(self) -> None:
+        """Sends any move held back by `moveAway` and waits for the game to see the last input, before a capture."""
+        if self.input.flush(): self.invalidateFrame()
+        self.input.settle()
+
+    def invalidateFrame(self) -> None:
+        """Drops the captures of the current frame. Needed after any input, since it can change the screen right away."""
+        self.frameCache.invalidate()
+
+        # the frame being captured right now might have started before the input
+        if self.captureThread.running:
+            self.frameSeq = max(self.frameSeq, self.captureThread.seq + 1)
+
+    def startCapture(self) -> None:
+        """Starts the capture thread if CAPTURE_THREAD is set, and the field parser if PREFETCH_FIELDS is set. The window has to be found first."""
+        if TAS.CAPTURE_THREAD:
+            self.frameSeq = self.captureThread.seq
+            self.captureThread.start()
+
+        if TAS.PREFETCH_FIELDS and self.fieldParser is None:
+            self.fieldParser = ThreadPoolExecutor(TAS.PREFETCH_WORKERS, thread_name_prefix = "fieldParser")
+
+    def stopCapture(self) -> None:
+        """Stops the capture thread and the field parser, if they're running."""
+        self.captureThread.stop()
+        self.frameCache.invalidate()
+
+        if self.fieldParser is not None:
+            # fields that didn't start yet get parsed on access instead
+            self.fieldParser.shutdown(cancel_futures = True)
+            self.fieldParser = None
+
+    def getRegionOrScreen(self, box: tuple[int, int, int, int]) -> tuple[Image.Image, Image.Image | None]:
+        """Get a screenshot of an area of the window, and of the whole window only when it's needed to check for the end of the day.
+
+        Args:
+            box: The (left, top, right, bottom) of the area in window coordinates.
+
+        Returns:
+            The area, and the whole window if "checkDayEnd" is True (None otherwise). Both come from the same capture.
+        """
+        if self.checkDayEnd:
+            screen = self.getScreen()
+            return screen.crop(box), screen
+        
+        return self.getRegion(box), None
+
+    def locateOnWindow(self, template: Template, screen: Image.Image | None = None, *, confidence: float | None = None) -> Box | None:
+        """Looks for a template in the window, only inside the area it's expected to be in if it has one.
+
+        Args:
+            template: The template to look for.
+            screen: A screenshot of the whole window to look in. If not given, only the needed area gets captured.
+            confidence: Minimum match score. Defaults to the template's.
+
+        Returns:
+            Where the template was found in window coordinates, or None if it wasn't.
+        """
+        if template.region is not None:
+            area = self.getRegion(template.region) if screen is None else screen.crop(template.region)
+            box  = locate(template, area, confidence = confidence, offset = template.region[:2])
+            if box is not None or not TAS.LOCATE_FALLBACK: return box
+
+        if screen is None: screen = self.getScreen()
+        return locate(template, screen, confidence = confidence)
+
     def moveTo(self, at: tuple[int, int]) -> None:
         """Moves mouse to point given in window coordinates."""
-        pg.moveTo(*self.mouseOffset(*at))
+        self.input.moveTo(*self.mouseOffset(*at))
+        self.invalidateFrame()
+
+    def moveAway(self, at: tuple[int, int]) -> None:
+        """Moves mouse out of the way of the next capture, to a point given in window coordinates.
+
+        The move is only sent before the next capture or click, and never if the mouse gets moved elsewhere first.
+        """
+        self.input.moveAway(*self.mouseOffset(*at))
 
     def click(self, at: tuple[int, int]) -> None:
         """Click on the point given in window coordinates."""
         self.moveTo(at)
-        pg.mouseDown()
-        pg.mouseUp()
+        self.input.mouseDown()
+        self.input.mouseUp()
+        self.invalidateFrame()
 
     def dragTo(self, at: tuple[int, int]) -> None:
         """Drags from the current mouse position to the point given in window coordinates and releases."""
-        pg.mouseDown()
+        self.input.mouseDown()
         self.moveTo(at)
-        pg.mouseUp()
+        self.input.mouseUp()
+        self.invalidateFrame()
+
+    def gesture(self) -> Gesture:
+        """Starts a gesture in window coordinates. Send it with `play` once it's complete."""
+        return Gesture(self.mouseOffset)
+
+    def play(self, gesture: Gesture) -> None:
+        """Sends a gesture built with `gesture`, timed on the game's frames."""
+        self.input.play(gesture)
+        self.invalidateFrame()
+
+    def waitAnimation(
+        self, region: tuple[int, int, int, int], timeout: float,
+        done: Callable[[np.ndarray], bool] | None = None
+    ) -> bool:
+        """Waits for an animation in an area of the window to be over, checking every new frame.
+
+        If "ADAPTIVE_WAITS" is False, or the animation doesn't end in time, this is the same as sleeping for the timeout.
+
+        Args:
+            region: The (left, top, right, bottom) of the area in window coordinates.
+            timeout: How long the animation can take at most, in seconds.
+            done: Tells from a capture of the area, as an array, whether the animation is over.
+                Defaults to waiting for the area to change and then stop changing.
+
+        Returns:
+            True if the animation was seen ending, False if the timeout was reached.
+        """
+        if not TAS.ADAPTIVE_WAITS:
+            if timeout > 0: time.sleep(timeout)
+            return False
+
+        if done is None: done = Settled(ANIMATION_STILL_FRAMES)
+
+        end = time.perf_counter() + timeout
+        while True:
+            if done(np.asarray(self.getRegion(region))): return True
+            if time.perf_counter() >= end:               return False
+
+            # captures are shared within a frame, so without this the same frame would be checked
+            # over and over and count as a still one. with the capture thread, the next capture
+            # waits for a newer frame by itself once the cached one is dropped
+            if not self.captureThread.running: self.frameCache.frames.sleep(1)
+            self.frameCache.invalidate()
+
+    def waitAnimationIn(self, gesture: Gesture, region: tuple[int, int, int, int], frames: int) -> Gesture:
+        """Adds a wait for an animation to a gesture. It's a plain wait of `frames` if "ADAPTIVE_WAITS" is False."""
+        if not TAS.ADAPTIVE_WAITS: return gesture.wait(frames)
+        return gesture.then(lambda: self.waitAnimation(region, frames / Frames.FRAME_RATE))
 
     def dragToWithGive(self, at: tuple[int, int]) -> None:
         """Drags from the current mouse position to the point given, but waits for a "Give" banner before releasing.
@@ -552,7 +796,7 @@ class TAS:
         will accept a document dropped on them. While waiting, moves the mouse around in a small area near the given
         point to allow the give banner to move out from behind textboxes.
         """
-        pg.mouseDown()
+        self.input.mouseDown()
         self.moveTo(at)
 
         if self.skipGive: self.skipGive = False
@@ -560,11 +804,11 @@ class TAS:
             pos = list(at)
             th  = [0, 0]
             while True:
-                screen = self.getScreen()
-                if pg.locate(TAS.GIVE_BANNER, screen.crop(PERSON_AREA), confidence = 0.5) is not None: break
+                person, screen = self.getRegionOrScreen(PERSON_AREA)
+                if locate(TAS.GIVE_BANNER, person, confidence = 0.5) is not None: break
 
                 # needed in some edge cases so it doesn't get stuck
-                if self.checkDayEnd and pg.locate(TAS.BUTTONS["sleep"], screen) is not None: break 
+                if screen is not None and self.locateOnWindow(TAS.BUTTONS["sleep"], screen) is not None: break 
 
                 pos[0] = at[0] + math.sin(th[0]) * DRAG_TO_WITH_GIVE_AMPLITUDE[0] - DRAG_TO_WITH_GIVE_POS_OFFS[0]
                 pos[1] = at[1] + math.sin(th[1]) * DRAG_TO_WITH_GIVE_AMPLITUDE[1] - DRAG_TO_WITH_GIVE_POS_OFFS[1]
@@ -572,7 +816,8 @@ class TAS:
                 th[1] += DRAG_TO_WITH_GIVE_THETA_INC[1]
                 self.moveTo(pos)
 
-        pg.mouseUp()
+        self.input.mouseUp()
+        self.invalidateFrame()
 
     def waitForAreaChange(self, area: tuple[int, int, int, int]) -> np.ndarray:
         """Wait for a change in the given screen area, continuously scanning that area of the screen.
@@ -583,8 +828,8 @@ class TAS:
         Returns:
             The cropped screen image of the give area after a change is seen.
         """
-        before = np.asarray(self.getScreen().crop(area))
-        while np.array_equal(before, np.asarray(self.getScreen().crop(area))): pass
+        before = np.asarray(self.getRegion(area))
+        while np.array_equal(before, np.asarray(self.getRegion(area))): pass
         return before
 
     def waitForGiveAreaChange(self, *, update: bool = True, sleep: bool = True) -> None:
@@ -602,22 +847,22 @@ class TAS:
 
         if sleep: time.sleep(0.25)
 
-    def waitFor(self, button: Image.Image, *, move: bool = True) -> pg.Point:
+    def waitFor(self, button: Template, *, move: bool = True) -> pg.Point:
         """Waits for the button image to appear on screen.
 
         Continuously scans the screen, waiting for the button image to be visible.
 
         Args:
-            button: The image of a button to wait for.
+            button: The template of a button to wait for.
             move: Whether to move the mouse to the upper-left corner of the screen at the start before waiting, to
                 ensure it is not in the way of the button.
 
         Returns:
             The coordinates of the center of the button.
         """
-        if move: self.moveTo((0, 0))
+        if move: self.moveAway((0, 0))
         while True:
-            box = pg.locate(button, self.getScreen())
+            box = self.locateOnWindow(button)
             if box is not None: return pg.center(box)
 
     def waitForSleepButton(self) -> None:
@@ -627,7 +872,7 @@ class TAS:
 
     def goToWantedCriminals(self) -> None:
         """Turns the page of the bulletin until the wanted criminals page is seen."""
-        while pg.locate(TAS.WANTED_CRIMINALS, self.getScreen()) is None:
+        while self.locateOnWindow(TAS.WANTED_CRIMINALS) is None:
             self.click(BULLETIN_NEXT_BUTTON)
 
     def openShutter(self, *, wait = True) -> None:
@@ -636,7 +881,7 @@ class TAS:
             self.click(SHUTTER_LEVER)
         
         if wait:
-            time.sleep(SHUTTER_OPEN_TIME)
+            self.waitAnimation(SHUTTER_AREA, SHUTTER_OPEN_TIME)
 
     def closeShutter(self, *, wait = True) -> None:
         if self.shutter:
@@ -644,7 +889,7 @@ class TAS:
             self.click(SHUTTER_LEVER)
 
         if wait:
-            time.sleep(SHUTTER_OPEN_TIME)
+            self.waitAnimation(SHUTTER_AREA, SHUTTER_OPEN_TIME)
 
     def nextPartial(self) -> bool:
         # TODO rewrite this doc to explain new behavior
@@ -675,18 +920,17 @@ class TAS:
             # waits for "next!" bubble to appear
             while True:
                 self.click(HORN)
-                screen = self.getScreen()
+                bubble, screen = self.getRegionOrScreen(NEXT_BUBBLE_AREA)
 
-                if np.array_equal(TAS.NEXT_BUBBLE, np.asarray(screen.crop(NEXT_BUBBLE_AREA))): break
-                if self.checkDayEnd and pg.locate(TAS.BUTTONS["sleep"], screen) is not None: return False 
+                if np.array_equal(TAS.NEXT_BUBBLE, np.asarray(bubble)): break
+                if screen is not None and self.locateOnWindow(TAS.BUTTONS["sleep"], screen) is not None: return False 
 
         # wait for person to appear (if the palette is detected, the person is there)
         while True:
-            screen = self.getScreen()
-            appearance = screen.crop(PERSON_AREA)
+            appearance, screen = self.getRegionOrScreen(PERSON_AREA)
 
             if Face.getPalette(appearance) is not None: break
-            if self.checkDayEnd and pg.locate(TAS.BUTTONS["sleep"], screen) is not None: return False 
+            if screen is not None and self.locateOnWindow(TAS.BUTTONS["sleep"], screen) is not None: return False 
 
         self.documentStack.reset()
         self.transcription.reset()
@@ -714,7 +958,7 @@ class TAS:
 
             # this converts the colored image from the screenshot to an image with
             # black background and white text (so it's easier to compare to the digits' images)
-            diff = bgFilter(TAS.WEIGHT_BG, np.asarray(self.getScreen().crop(WEIGHT_AREA)))
+            diff = bgFilter(TAS.WEIGHT_BG, np.asarray(self.getRegion(WEIGHT_AREA)))
             np.copyto(diff, TAS.WEIGHT_FILTER, where = diff != 0)
             weightCheck = parseText(
                 Image.fromarray(diff), None, TAS.FONTS["digits"], None,
@@ -735,7 +979,7 @@ class TAS:
     def waitForAllTicks(self) -> None:
         """Waits for all ticks on the night screen to appear."""
         self.waitFor(TAS.DOLLAR_SIGN)
-        self.moveTo((0, 0))
+        self.moveAway((0, 0))
 
     def clickOnTick(self, tick: str) -> None:
         """Clicks on a tick on the night screen.
@@ -748,7 +992,7 @@ class TAS:
         Raises:
             TypeError: If tick is not located on screen.
         """
-        self.click((END_TICK_X, pg.center(pg.locate(TAS.TICKS[tick], self.getScreen())).y))
+        self.click((END_TICK_X, pg.center(self.locateOnWindow(TAS.TICKS[tick])).y))
 
     def story(self) -> None:
         """Clicks the Story button on the main menu of the game."""
@@ -785,9 +1029,17 @@ class TAS:
         self.click(NEW_BUTTON)
         self.startRun()
         time.sleep(MENU_DELAY)
-        pg.click(*self.mouseOffset(*INTRO_BUTTON), clicks = 11, interval = 0.05) # skip introduction
+        self.skipIntro()
         time.sleep(MENU_DELAY)
 
+    def skipIntro(self) -> None:
+        """Clicks through the introduction of a new game."""
+        gesture = self.gesture()
+        for _ in range(INTRO_CLICKS):
+            gesture.click(INTRO_BUTTON).wait(INTRO_CLICK_FRAMES)
+
+        self.play(gesture)
+
     def daySetup(self) -> None:
         """Sets up for the day by clicking "Walk to work" and setting flags to their default state."""
         self.click(INTRO_BUTTON)
@@ -804,7 +1056,18 @@ class TAS:
         self.checkDayEnd = False
         self.click(SLEEP_BUTTON)
         time.sleep(MENU_DELAY)
+        self.droppedInputs[self.date] = dict(self.input.dropped)
         self.date += timedelta(days = 1)
+        logger.debug(OCR_CACHE.stats())
+        logger.debug(self.frameCache.stats())
+        logger.debug(self.input.stats())
+        logger.info(self.input.droppedStats())
+        self.input.resetStats()
+
+    def saveOCRCache(self) -> None:
+        """Writes the text recognition cache to OCR_CACHE_FILE, if one is set."""
+        if TAS.OCR_CACHE_FILE is not None:
+            OCR_CACHE.save(TAS.OCR_CACHE_FILE)
 
     def restartFrom(self, day: tuple[int, int], date: date, story: bool = True) -> None:
         """Restarts from an earlier day by clicking on given coordinates for the save and setting the date.
@@ -815,9 +1078,7 @@ class TAS:
             story: Whether to click the story button before the day save. Should be True if currently on the main menu.
         """
         if story: self.story()
-        self.click(day)
-        time.sleep(0.25)
-        self.click(CONTINUE_BUTTON)
+        self.play(self.gesture().click(day).wait(SAVE_SELECT_FRAMES).click(CONTINUE_BUTTON))
         time.sleep(MENU_DELAY)
         self.date = date
 
@@ -954,10 +1215,11 @@ class TAS:
 
             self.moveTo(pos)
             self.dragTo(PASSPORT_CONFISCATE_POS)
-            time.sleep(PASSPORT_DRAWER_OPEN_TIME)
+            self.waitAnimation(PASSPORT_DRAWER_AREA, PASSPORT_DRAWER_OPEN_TIME)
 
+            # the slip comes out as the drawer closes
             self.click(PASSPORT_CONFISCATE_POS)
-            time.sleep(max(CONFISCATE_SLIP_APPEAR_TIME, PASSPORT_DRAWER_CLOSE_TIME))
+            self.waitAnimation(PASSPORT_DRAWER_AREA, max(CONFISCATE_SLIP_APPEAR_TIME, PASSPORT_DRAWER_CLOSE_TIME))
 
             if (not detain) and pos != PASSPORT_ALLOW_POS:
                 self.moveTo(onTable(centerOf(VISA_SLIP_AREA)))
@@ -1004,6 +1266,23 @@ class TAS:
                 return True
         return False
 
+    def stamp(self, stamp: tuple[int, int], close: bool, waitClose: bool) -> Gesture:
+        """Returns a gesture that opens the stamp bar and presses a stamp. More can be added to it before it's sent.
+
+        Args:
+            stamp: The point to click for the stamp in window coordinates.
+            close: Whether to close the stamp bar after stamping.
+            waitClose: Whether to wait for the stamp bar to finish closing. Ignored if "close" is False.
+        """
+        gesture = self.gesture().click(STAMP_ENABLE)
+        self.waitAnimationIn(gesture, STAMP_BAR_AREA, STAMP_OPEN_FRAMES).click(stamp)
+
+        if close:
+            gesture.wait(STAMP_PRESS_FRAMES).click(STAMP_DISABLE)
+            if waitClose: self.waitAnimationIn(gesture, STAMP_BAR_AREA, STAMP_CLOSE_FRAMES)
+
+        return gesture
+
     def allowAndGive(self, *, close: bool = False, waitClose: bool = True) -> None:
         """Approves the entrant and returns their passport.
 
@@ -1017,16 +1296,7 @@ class TAS:
         """
         self.handleConfiscate(PASSPORT_ALLOW_POS)
 
-        self.click(STAMP_ENABLE)
-        time.sleep(STAMP_OPEN_TIME)
-        self.click(STAMP_APPROVE)
-
-        if close: 
-            time.sleep(0.25)
-            self.click(STAMP_DISABLE)
-            if waitClose: time.sleep(STAMP_CLOSE_TIME)
-
-        self.moveTo(PASSPORT_ALLOW_POS)
+        self.play(self.stamp(STAMP_APPROVE, close, waitClose).moveTo(PASSPORT_ALLOW_POS))
         self.dragToWithGive(PERSON_PASSPORT_POS)
 
     def denyAndGive(self, *, close: bool = False, waitClose: bool = True) -> None:
@@ -1042,16 +1312,7 @@ class TAS:
         """
         self.handleConfiscate(PAPER_SCAN_POS)
 
-        self.click(STAMP_ENABLE)
-        time.sleep(STAMP_OPEN_TIME)
-        self.click(STAMP_DENY)
-
-        if close: 
-            time.sleep(0.25)
-            self.click(STAMP_DISABLE)
-            if waitClose: time.sleep(STAMP_CLOSE_TIME)
-
-        self.moveTo(PASSPORT_DENY_POS)
+        self.play(self.stamp(STAMP_DENY, close, waitClose).moveTo(PASSPORT_DENY_POS))
         self.dragToWithGive(PERSON_PASSPORT_POS)
 
     def passportOnlyAllow(self, *, nextCheck: bool = True) -> bool:
@@ -1103,22 +1364,23 @@ class TAS:
         before = np.asarray(self.getScreen().crop(TABLE_AREA))
         if move: self.moveTo(PAPER_POS)
         self.dragTo(PAPER_SCAN_POS)
-        self.moveTo(PAPER_POS) # get cursor out of the way
+        self.moveAway(PAPER_POS) # get cursor out of the way
         docImg = bgFilter(before, np.asarray(self.getScreen().crop(TABLE_AREA)))
         # only crop document out of picture
         ys, xs = np.where((docImg != (0, 0, 0)).all(axis = -1))
         offs = (min(xs), min(ys))
         docImg = Image.fromarray(docImg).crop(offs + (max(xs) + 1, max(ys) + 1))
 
-        for Document in TAS.DOCUMENTS:
-            if Document.checkMatch(docImg):
-                doc = Document(docImg, offs)
+        Document = TAS.DOCUMENT_LABELS.find(docImg)
+        if Document is not None:
+            doc = Document(docImg, offs)
+            if self.fieldParser is not None: doc.prefetch(self.fieldParser)
 
-                if self.doConfiscate and self.currRun.confiscatePassportWhen(doc):
-                    self.confiscate = True
+            if self.doConfiscate and self.currRun.confiscatePassportWhen(doc):
+                self.confiscate = True
 
-                if TAS.SETTINGS["debug"]: logger.info(doc)
-                return doc
+            if TAS.SETTINGS["debug"]: logger.info(doc)
+            return doc
             
         if self.poison:
             self.poison = False
@@ -1126,30 +1388,24 @@ class TAS:
             if self.date != TAS.DAY_20:
                 raise TASException(f"Unable to use poison on day {dateToDay(self.date)}")
 
-            self.moveTo(SLOTS[-1])
-            self.dragTo(PAPER_SCAN_POS)
+            gesture = self.gesture().moveTo(SLOTS[-1]).dragTo(PAPER_SCAN_POS)
 
             # open poison
-            self.click((820, 505))
-            self.click((740, 400))
-            self.click((670, 455))
+            gesture.click((820, 505)).click((740, 400)).click((670, 455))
 
             # drag over passport and apply
-            self.dragTo((520, 355))
-            self.click((790, 370))
+            gesture.dragTo((520, 355)).click((790, 370))
 
             # put aside
-            self.dragTo(SLOTS[-1])
+            self.play(gesture.dragTo(SLOTS[-1]))
 
-        for passportType in TAS.PASSPORT_TYPES:
-            if np.array_equal(np.asarray(docImg.crop(passportType.layout.label)), passportType.backgrounds.label):
-                type_ = passportType
-                break
-        else: return None
+        type_ = TAS.PASSPORT_LABELS.find(docImg)
+        if type_ is None: return None
 
         if self.date == TAS.DAY_1: return type_.nation
 
         passport = Passport(docImg, offs, type_)
+        if self.fieldParser is not None: passport.prefetch(self.fieldParser)
 
         if self.doConfiscate and self.currRun.confiscatePassportWhen(passport):
             self.confiscate = True
@@ -1159,7 +1415,16 @@ class TAS:
     
     def fastPassportScan(self, before: np.ndarray, after: np.ndarray) -> Nation:
         papers = np.asarray(bgFilter(before, after))
-        gray   = rgb2gray(papers)
+
+        # the covers are made of a few colors, so they can be told apart without straightening them first
+        passportType = TAS.PASSPORT_PALETTES.classify(papers, (
+            passportType for passportType in TAS.PASSPORT_TYPES
+            if passportType.nation not in (Nation.ANTEGRIA, Nation.UNITEDFED, Nation.OBRISTAN) # only used on day 1, and these passports can't appear
+        ))
+        if passportType is not None: return passportType.nation
+
+        logger.debug("Passport cover colors are unclear, deskewing")
+        gray = rgb2gray(papers)
 
         for i in range(3): # tries no rotation, max 45 degree rotation, and max 90 degree rotation
             rotated = Image.fromarray(papers)
@@ -1176,7 +1441,7 @@ class TAS:
 
     def interrogate(self) -> None:
         self.click(INTERROGATE_BUTTON)
-        time.sleep(0.35) # otherwise it doesn't rly work 
+        time.sleep(INTERROGATE_TIME) # otherwise it doesn't rly work 
 
     def getRulebook(self) -> dict[str, dict | tuple[int, int]]:
         if self.date < TAS.DAY_27:
@@ -1194,8 +1459,8 @@ class TAS:
         msg = bgFilter(before, np.asarray(self.getScreen().crop(TABLE_AREA)))
 
         if (
-            pg.locate(TAS.MATCHING_DATA,  msg, confidence = 0.6) is None and
-            pg.locate(TAS.NO_CORRELATION, msg, confidence = 0.6) is None
+            locate(TAS.MATCHING_DATA,  msg, confidence = 0.6) is None and
+            locate(TAS.NO_CORRELATION, msg, confidence = 0.6) is None
         ): return False
         
         self.click(INSPECT_BUTTON)
@@ -1227,12 +1492,12 @@ class TAS:
 
     def giveAllGiveAreaDocs(self, before: np.ndarray, *, delay: bool = False) -> None:
         while True: 
-            screen = self.getScreen()
+            giveArea, screen = self.getRegionOrScreen(GIVE_AREA)
 
-            if np.array_equal(before, np.asarray(screen.crop(GIVE_AREA))): break
+            if np.array_equal(before, np.asarray(giveArea)): break
 
             # needed in some edge cases so it doesn't get stuck
-            if self.checkDayEnd and pg.locate(TAS.BUTTONS["sleep"], screen) is not None: break 
+            if screen is not None and self.locateOnWindow(TAS.BUTTONS["sleep"], screen) is not None: break 
             
             self.moveTo(PAPER_POS)
             self.dragTo(PERSON_POS)
@@ -1241,20 +1506,14 @@ class TAS:
     def denyAndGiveWithReason(self, *, close: bool = False, waitClose: bool = True) -> None:
         if self.handleConfiscateAndDetain(PAPER_SCAN_POS): return
 
-        self.click(STAMP_ENABLE)
-        time.sleep(STAMP_OPEN_TIME)
-        self.click(STAMP_DENY)
+        gesture = self.stamp(STAMP_DENY, False, False)
+        gesture.moveTo(PAPER_SCAN_POS).dragTo(PASSPORT_REASON_POS).click(REASON_STAMP)
 
-        self.moveTo(PAPER_SCAN_POS)
-        self.dragTo(PASSPORT_REASON_POS)
-        self.click(REASON_STAMP)
+        if close:
+            gesture.wait(STAMP_PRESS_FRAMES).click(STAMP_DISABLE)
+            if waitClose: self.waitAnimationIn(gesture, STAMP_BAR_AREA, STAMP_CLOSE_FRAMES)
 
-        if close: 
-            time.sleep(0.25)
-            self.click(STAMP_DISABLE)
-            if waitClose: time.sleep(STAMP_CLOSE_TIME)
-
-        self.moveTo(PASSPORT_REASON_POS)
+        self.play(gesture.moveTo(PASSPORT_REASON_POS))
         self.dragToWithGive(PERSON_PASSPORT_POS)   
 
     def passportCheck(self, before: np.ndarray, befCheck: bool, denyWhen: Callable[[Passport], bool]) -> bool:
@@ -1301,7 +1560,7 @@ class TAS:
                 screen = self.getScreen()
                 if not np.array_equal(before, np.asarray(screen.crop(GIVE_AREA))): break
 
-                if pg.locate(TAS.VISA_SLIP, screen, confidence = 0.9) is not None:
+                if self.locateOnWindow(TAS.VISA_SLIP, screen, confidence = 0.9) is not None:
                     time.sleep(0.25)
 
                     if not forceAllow: 
@@ -1309,7 +1568,7 @@ class TAS:
                         self.dragTo(VISA_SLIP_DENY_POS)
                     
                     self.click(STAMP_ENABLE)
-                    time.sleep(STAMP_OPEN_TIME)
+                    self.waitAnimation(STAMP_BAR_AREA, STAMP_OPEN_TIME)
 
                     if forceAllow: 
                         self.click(STAMP_APPROVE)
@@ -1576,29 +1835,29 @@ class TAS:
     # guns and attacks
     def getTranqGun(self) -> None:
         # wait for keyhole
-        while pg.locate(TAS.TRANQ_GUN_KEYHOLE, self.getScreen()) is None: pass
+        while self.locateOnWindow(TAS.TRANQ_GUN_KEYHOLE) is None: pass
         time.sleep(0.5)
         # open rifle
         self.moveTo(SLOTS[-1])
         self.dragTo(TRANQ_GUN_ENABLE_KEY_POS)
         # wait for darts
-        while pg.locate(TAS.DARTS, self.getScreen().crop(TABLE_AREA)): pass
+        while locate(TAS.DARTS, self.getRegion(TABLE_AREA)): pass
         time.sleep(GUN_BULLETS_APPEAR_TIME)
         # click on darts
-        self.click(pg.center(pg.locate(TAS.DARTS, self.getScreen())))
+        self.click(pg.center(self.locateOnWindow(TAS.DARTS)))
 
     def getSniper(self) -> None:
         # wait for keyhole
-        while pg.locate(TAS.SNIPER_KEYHOLE, self.getScreen()) is None: pass
+        while self.locateOnWindow(TAS.SNIPER_KEYHOLE) is None: pass
         time.sleep(0.5)
         # open rifle
         self.moveTo(SLOTS[-1])
         self.dragTo(SNIPER_ENABLE_KEYPOS)
         # wait for bullets
-        while pg.locate(TAS.BULLETS, self.getScreen().crop(TABLE_AREA)): pass
+        while locate(TAS.BULLETS, self.getRegion(TABLE_AREA)): pass
         time.sleep(GUN_BULLETS_APPEAR_TIME)
         # click on bullets
-        self.click(pg.center(pg.locate(TAS.BULLETS, self.getScreen())))
+        self.click(pg.center(self.locateOnWindow(TAS.BULLETS)))
 
     def detectPeople(self, area: tuple[int, int, int, int], *, tranq: bool = False) -> tuple[tuple[int, int], ...]:
         ys, xs = np.where((np.asarray(self.getScreen().crop(area)) == PEOPLE_COLOR).all(axis = -1))
@@ -1620,26 +1879,26 @@ class TAS:
         self.moveTo(PAPER_POS)
         self.dragTo(PAPER_SCAN_POS)
         # wait for screws
-        while pg.locate(TAS.SCREW, self.getScreen().crop(TABLE_AREA)) is None: pass
-        time.sleep(0.25)
+        while locate(TAS.SCREW, self.getRegion(TABLE_AREA)) is None: pass
         # unscrew
-        self.click((695, 405))
-        self.click((800, 405))
-        self.click((695, 490))
-        self.click((800, 490))
+        self.play(
+            self.gesture().wait(BOMB_SCREWS_FRAMES)
+                .click((695, 405)).click((800, 405))
+                .click((695, 490)).click((800, 490))
+        )
         # wait for wires and calensk
-        while pg.locate(TAS.WIRES, self.getScreen().crop(TABLE_AREA)) is None: pass
-        while pg.locate(TAS.WIRES, self.getScreen().crop(TABLE_AREA)) is not None:
+        while locate(TAS.WIRES, self.getRegion(TABLE_AREA)) is None: pass
+        while locate(TAS.WIRES, self.getRegion(TABLE_AREA)) is not None:
             # try to cut first wire
             self.click((735, 440))
-            self.moveTo(TABLE_AREA[:2])
+            self.moveAway(TABLE_AREA[:2])
         # when cutting first wire succeeds, wires is no longer located, 
-        # so it falls here and cuts all other wires
-        self.click((700, 440))
-        self.click((785, 440))
-        self.click((760, 440))
-        # give bomb to calensk
-        self.dragTo(PAPER_POS)
+        # so it falls here and cuts all other wires, then gives bomb to calensk
+        self.play(
+            self.gesture()
+                .click((700, 440)).click((785, 440)).click((760, 440))
+                .dragTo(PAPER_POS)
+        )
         self.giveAllGiveAreaDocs(self.lastGiveArea, delay = True)
 
     # document handling
@@ -15,8 +15,6 @@ OLD_WINDOW_RESOLUTION = (1140, 640)
 FULLSCREEN_REAL_BOX   = (105, 60, 1815, 1020)
 NEW_MOUSE_OFFSET      = (2, 2)
 
-MOMENTUM_STOP_TIME = 0.15
-
 SLEEP_BUTTON = (SLEEP_BUTTON[0], SLEEP_BUTTON[1] - 140)
 
 class NewTAS(TAS):
@@ -24,7 +22,8 @@ class NewTAS(TAS):
         super().__init__()
         
         logger.info("**EXPERIMENTAL VERSION**")
-        pg.PAUSE = 0.034 
+        self.input.settleTimes  = EXPERIMENTAL_INPUT_SETTLE_TIMES
+        self.input.settleFrames = EXPERIMENTAL_INPUT_SETTLE_FRAMES
 
         passportTypes = list(TAS.PASSPORT_TYPES)
         # TODO probably other passports are wrong too but this still needs testing
@@ -44,13 +43,18 @@ class NewTAS(TAS):
             )
         )
         TAS.PASSPORT_TYPES = tuple(passportTypes)
+        TAS.loadLabelIndexes()
 
-    def getScreen(self) -> Image.Image:
+    def grabScreen(self) -> Image.Image:
         realScreen = ImageGrab.grab(win32gui.GetWindowRect(self.hwnd)).convert("RGB").crop(FULLSCREEN_REAL_BOX)
         size = offsetPoint(OLD_WINDOW_RESOLUTION, OLD_WINDOW_OFFSET)
         offsetImg = Image.new("RGB", size)
         offsetImg.paste(realScreen.resize(OLD_WINDOW_RESOLUTION, Image.Resampling.NEAREST), OLD_WINDOW_OFFSET + size)
         return offsetImg
+
+    def getRegion(self, box: tuple[int, int, int, int]) -> Image.Image:
+        # the window is rescaled, so areas can't be captured on their own
+        return self.getScreen().crop(box)
     
     def mouseOffset(self, x: int, y: int) -> tuple[int, int]:
         bX, bY, _, _ = win32gui.GetWindowRect(self.hwnd)
@@ -59,12 +63,17 @@ class NewTAS(TAS):
             bY + FULLSCREEN_REAL_BOX[1] + NEW_MOUSE_OFFSET[1] + (y - OLD_WINDOW_OFFSET[1]) // 2 * 3,
         )
     
+    def gesture(self) -> Gesture:
+        # same waits as dragTo
+        return Gesture(self.mouseOffset, dragHold = toFrames(MOMENTUM_STOP_TIME), dragRelease = toFrames(DRAG_RELEASE_TIME))
+
     def dragTo(self, at: tuple[int, int]) -> None:
-        pg.mouseDown()
-        pg.dragTo(*self.mouseOffset(*at), button = 'left', mouseDownUp = False)
+        self.input.mouseDown()
+        self.input.moveTo(*self.mouseOffset(*at))
         time.sleep(MOMENTUM_STOP_TIME)
-        pg.mouseUp()
-        time.sleep(0.1) # idk what this does but if it's not here it breaks stuff
+        self.input.mouseUp()
+        self.invalidateFrame()
+        time.sleep(DRAG_RELEASE_TIME) # idk what this does but if it's not here it breaks stuff
 
     def newGame(self) -> None:
         self.date = TAS.DAY_1
@@ -72,7 +81,7 @@ class NewTAS(TAS):
         self.click(NEW_BUTTON)
         self.startRun()
         time.sleep(MENU_DELAY + 1.5)
-        pg.click(*self.mouseOffset(*INTRO_BUTTON), clicks = 11, interval = 0.05) # skip introduction
+        self.skipIntro()
         time.sleep(MENU_DELAY)
 
 if __name__ == "__main__": NewTAS().run()
\ No newline at end of file
@@ -0,0 +1,158 @@
+# builds the face lookup tables used by modules/faceRecognition.py.
+#
+# usage (from the repo root):
+#   python tools/faceTables.py build <type> (--images <folder> | --generator <module>:<function>) [-o <file>] [-j <workers>]
+#   python tools/faceTables.py convert <file.ptbt> [-o <file.ptbs>]
+#   python tools/faceTables.py verify <file.ptbs>
+#
+# images are faces as they appear in game, named "<sex>_<noseMouth>_<eyes>_<head>[_anything].png",
+# with sex being M or F. generators are functions taking a FaceType and yielding (Face, Image) pairs,
+# for when faces are rendered on the fly instead of being saved first
+
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL                import Image
+from typing             import Callable, Iterable, Iterator
+from argparse           import ArgumentParser
+from importlib          import import_module
+from concurrent.futures import ProcessPoolExecutor
+import time, numpy as np
+
+from modules.constants.other import Sex, TASException
+from modules.faceRecognition import (
+    Face, FaceType, FaceTable, FACE_RECORD, SORTED_TABLE_EXT, UNSORTED_TABLE_EXT
+)
+
+ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+# faces are sent to workers in chunks, so they aren't waiting on the main process all the time
+CHUNK_SIZE = 256
+
+def hashFace(job: tuple[FaceType, int, str | Image.Image]) -> tuple[bytes, int] | None:
+    type_, packed, img = job
+    if isinstance(img, str): img = Image.open(img)
+
+    fixed, _ = Face.normalize(img.convert("RGB"), type_)
+    if fixed is None: return None
+    return Face.hashImage(fixed), packed
+
+def parseName(file: str) -> Face:
+    sex, noseMouth, eyes, head = os.path.splitext(os.path.basename(file))[0].split("_")[:4]
+    return Face(Sex[sex.upper()], int(noseMouth), int(eyes), int(head))
+
+def fromFolder(folder: str) -> Iterator[tuple[Face, str]]:
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith(".png"):
+            file = os.path.join(folder, name)
+            yield parseName(file), file
+
+def fromGenerator(spec: str, type_: FaceType) -> Iterable[tuple[Face, Image.Image]]:
+    module, function = spec.split(":")
+    generator: Callable[[FaceType], Iterable[tuple[Face, Image.Image]]] = getattr(import_module(module), function)
+    return generator(type_)
+
+def dedupe(records: np.ndarray) -> tuple[np.ndarray, int, int]:
+    """Drops repeated keys from sorted records, keeping the first. Returns the records,
+    how many were duplicates, and how many of those were collisions (same key, different face)."""
+    keep = np.ones(len(records), dtype = bool)
+    keep[1:] = records["key"][1:] != records["key"][:-1]
+
+    # every record gets compared with the one that was kept for its key
+    kept       = records[keep]
+    collisions = int((records["value"] != kept["value"][np.cumsum(keep) - 1]).sum())
+    return kept, len(records) - len(kept), collisions
+
+def checkTable(file: str, expected: np.ndarray | None = None) -> bool:
+    table = FaceTable.open(file)
+    if not table.verify():
+        print(f'"{file}": checksum mismatch or unsorted records')
+        return False
+
+    if expected is not None:
+        # every generated face has to be found, with the face that was kept for its key
+        idx = np.minimum(np.searchsorted(table.keys, expected["key"]), len(table) - 1)
+        if not (table.keys[idx] == expected["key"]).all() or not (table.records["value"][idx] == expected["value"]).all():
+            print(f'"{file}": lookups don\'t give back the generated faces')
+            return False
+
+    print(f'"{file}": {len(table)} faces, ok')
+    return True
+
+def build(type_: FaceType, faces: Iterable[tuple[Face, str | Image.Image]], out: str, workers: int | None) -> bool:
+    jobs = ((type_, face.toPacked(), img) for face, img in faces)
+
+    start   = time.perf_counter()
+    results = []
+    skipped = 0
+    with ProcessPoolExecutor(workers) as pool:
+        for result in pool.map(hashFace, jobs, chunksize = CHUNK_SIZE):
+            if result is None: skipped += 1
+            else:              results.append(result)
+
+    print(f"Hashed {len(results)} faces in {time.perf_counter() - start:.1f}s ({skipped} unusable)")
+    if not results: return False
+
+    records = FaceTable.sort(np.array(results, dtype = FACE_RECORD))
+    table, duplicates, collisions = dedupe(records)
+    if duplicates:
+        print(f"Dropped {duplicates} duplicate keys, {collisions} of which were collisions (first face kept)")
+
+    FaceTable.write(table, out)
+
+    # reading it back, the kept records are what lookups should return
+    return checkTable(out, table)
+
+def main() -> int:
+    parser   = ArgumentParser(description = "Builds and checks face lookup tables")
+    commands = parser.add_subparsers(dest = "command", required = True)
+
+    buildCmd = commands.add_parser("build", help = "hash faces into a sorted table")
+    buildCmd.add_argument("type", choices = [t.name.lower() for t in FaceType if t != FaceType.WANTED_PICTURE])
+    source = buildCmd.add_mutually_exclusive_group(required = True)
+    source.add_argument("--images",    help = "folder of face images")
+    source.add_argument("--generator", help = "<module>:<function> yielding (Face, Image) pairs")
+    buildCmd.add_argument("-o", "--output",  help = "output file (defaults to the one in assets/faces)")
+    buildCmd.add_argument("-j", "--workers", type = int, help = "worker processes (defaults to one per core)")
+
+    convertCmd = commands.add_parser("convert", help = f"sort a {UNSORTED_TABLE_EXT} table")
+    convertCmd.add_argument("input")
+    convertCmd.add_argument("-o", "--output")
+
+    verifyCmd = commands.add_parser("verify", help = f"check a {SORTED_TABLE_EXT} table")
+    verifyCmd.add_argument("input")
+
+    args = parser.parse_args()
+
+    try:
+        match args.command:
+            case "build":
+                type_ = FaceType[args.type.upper()]
+                out   = args.output or os.path.join(ASSETS, "faces", type_.value + SORTED_TABLE_EXT)
+
+                if args.images is None: faces = fromGenerator(args.generator, type_)
+                else:                   faces = fromFolder(args.images)
+
+                ok = build(type_, faces, out, args.workers)
+            case "convert":
+                out = args.output or os.path.splitext(args.input)[0] + SORTED_TABLE_EXT
+
+                if os.path.getsize(args.input) % FACE_RECORD.itemsize != 0:
+                    raise TASException("Invalid table file (key with no value)")
+
+                table, duplicates, collisions = dedupe(FaceTable.sort(np.fromfile(args.input, FACE_RECORD)))
+                if duplicates: print(f"Dropped {duplicates} duplicate keys ({collisions} collisions)")
+
+                FaceTable.write(table, out)
+                ok = checkTable(out)
+            case "verify":
+                ok = checkTable(args.input)
+    except TASException as e:
+        print(f"Error: {e}")
+        return 1
+
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())